@@ -3,7 +3,6 @@ import uuid
 from datetime import datetime
 from enum import Enum
 # Libraries
-from passlib.hash import bcrypt
 from tortoise import models, fields
 
 class Game(models.Model):
@@ -13,7 +12,7 @@ class Game(models.Model):
     platform = fields.CharField(max_length=50)
     status = fields.CharField(max_length=50, default="Wishlist")
     rating = fields.IntField(null=True)
-    owner = fields.ForeignKeyField("models.user", related_name = "games")
+    owner = fields.ForeignKeyField("models.User", related_name = "games")
     created_at = fields.DatetimeField(auto_now_add=True)
     updated_at = fields.DatetimeField(auto_now=True)
 
@@ -22,4 +21,8 @@ class Game(models.Model):
     
     class Meta:
         table = "games"
-        app = "models"
\ No newline at end of file
+        app = "models"
+        # Dashboard filters by owner, sorted by status or recency
+        indexes = (("owner_id", "status"), ("owner_id", "created_at"))
+        # pg_trgm GIN indexes behind /games/search; built by backend.migrate
+        trigram_indexes = ("gameTitle", "category", "platform")
\ No newline at end of file
@@ -1,8 +1,12 @@
 # Python
+import logging
 from datetime import datetime
 # Libraries
-from passlib.hash import bcrypt, argon2
 from tortoise import models, fields
+# Application Code
+from backend.hashing import hasher
+
+logger = logging.getLogger(__name__)
 
 class User(models.Model):
     user_id = fields.IntField(pk=True, unique=True)
@@ -11,24 +15,46 @@ class User(models.Model):
     digest = fields.CharField(max_length=128)
     fname = fields.CharField(max_length=50)
     lname = fields.CharField(max_length=50)
-    activated_at = fields.DatetimeField(default=True)
+    activated_at = fields.DatetimeField(auto_now_add=True)
     created_at = fields.DatetimeField(auto_now_add=True)
     updated_at = fields.DatetimeField(auto_now=True)
 
-    def set_password(self, raw_password: str):
-        """Hashes and stores the given password."""
+    async def set_password(self, raw_password: str):
+        """Hashes and stores the given password (off the event loop)."""
         # password_bytes = raw_password.encode("utf-8")[:72]
         # self.digest = bcrypt.hash(password_bytes)
-        self.digest = argon2.hash(raw_password)
+        self.digest = await hasher.hash(raw_password)
 
-    def verify_password(self, raw_password: str) -> bool:
-        """Verifies a password against the stored digest."""
+    async def verify_password(self, raw_password: str) -> bool:
+        """Verifies a password against the stored digest (off the event loop)."""
         #return bcrypt.verify(raw_password, self.digest)
-        return argon2.verify(raw_password, self.digest)
+        return await hasher.verify(raw_password, self.digest)
+
+    def needs_rehash(self) -> bool:
+        """True if the stored digest uses an outdated scheme or argon2 parameters."""
+        return hasher.needs_rehash(self.digest)
+
+    async def upgrade_password(self, raw_password: str) -> None:
+        """
+        Rehashes the password with the current policy and stores it.
+
+        Meant to run as a background task after a successful login. The
+        update only applies if the digest is unchanged, so it never clobbers
+        a password change that happened in the meantime.
+        """
+        old_digest = self.digest
+        try:
+            new_digest = await hasher.hash(raw_password)
+            await User.filter(user_id=self.user_id, digest=old_digest).update(digest=new_digest)
+        except Exception as e:
+            logger.warning("Password rehash failed for user %s: %s", self.user_id, e)
 
     def __str__(self):
         return f"<User {self.username}>"
     
     class Meta:
         table = "users"
-        app = "models"
\ No newline at end of file
+        app = "models"
+        # Not understood by Tortoise; turned into migrations by backend.migrate.
+        # Emails are unique ignoring case; login looks users up by lower(email).
+        unique_expression_indexes = ("lower(email)",)
\ No newline at end of file
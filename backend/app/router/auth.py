@@ -1,26 +1,32 @@
 # Libraries
-from passlib.hash import bcrypt, argon2
 from fastapi import FastAPI, Form, Depends
 from fastapi import APIRouter
-from fastapi.templating import Jinja2Templates
 from fastapi.staticfiles import StaticFiles
+from starlette.background import BackgroundTask
 from starlette.requests import Request
-from starlette.responses import JSONResponse, RedirectResponse
+from starlette.responses import RedirectResponse
 from tortoise.exceptions import IntegrityError
+from tortoise.functions import Lower
 # Application Code
+from backend import config
 from backend.config import app
-from backend.session import Session
+from backend.templating import templates
+from backend.responses import JSONResponse
+from backend.session import Session, SessionManager
 from backend.lifespan import lifespan
 from backend.app.models import User
+from backend.dependencies import get_session, get_session_manager
+from backend.ratelimit import RateLimit
 
 router = APIRouter(prefix="",tags=['auth'],)
-templates = Jinja2Templates(directory="backend/public/html")
 #---------------------SIGNUP--------------------------------
 @router.get("/signup")
 async def get_signup(request: Request):
     return templates.TemplateResponse("signup.html", {"request": request})
 
-@router.post("/signup")
+@router.post("/signup", dependencies=[
+    Depends(RateLimit("signup", config.RATE_LIMIT_SIGNUP_PER_IP, config.RATE_LIMIT_PERIOD)),
+])
 async def post_signup(
     fname: str = Form(...),
     lname: str = Form(...),
@@ -28,44 +34,62 @@ async def post_signup(
     username: str = Form(...),
     password: str = Form(...),
     password_confirmation: str = Form(...),
+    session_manager: SessionManager = Depends(get_session_manager),
 ):
     if password != password_confirmation:
         return JSONResponse({"error": "Passwords must match"}, status_code = 400)
     try:
         #digest = bcrypt.hash(password.encode("utf-8")[:72])
-        digest = argon2.hash(password)
-        user = await User.create(
+        user = User(
             username=username,
             fname=fname, 
             lname=lname, 
-            email=email,
-            digest=digest
+            # Stored lowercased; uniq_users_lower_email also rejects case variants
+            email=email.strip().lower(),
         )
+        await user.set_password(password)
+        await user.save()
     except IntegrityError as e:
         return JSONResponse({"error": "Failed to create user"}, status_code = 400)
-    return RedirectResponse(url = "/dashboard", status_code = 303)
+    session = await session_manager.create_session(user.user_id)
+    response = RedirectResponse(url = "/dashboard", status_code = 303)
+    response.set_cookie(config.SESSION_COOKIE, session.id, max_age = config.SESSION_TTL_SECONDS, httponly = True, samesite = "lax")
+    return response
 #-----------------LOGIN---------------------------------
-@router.post("/login")
+@router.post("/login", dependencies=[
+    Depends(RateLimit("login", config.RATE_LIMIT_LOGIN_PER_IP, config.RATE_LIMIT_PERIOD)),
+    Depends(RateLimit("login", config.RATE_LIMIT_LOGIN_PER_EMAIL, config.RATE_LIMIT_PERIOD, key="email")),
+])
 async def post_login(
     request: Request,
     email: str = Form(...),
-    password: str = Form(...)
+    password: str = Form(...),
+    session_manager: SessionManager = Depends(get_session_manager),
 ):
-    user = await User.get_or_none(email=email)
-    if not user or not bcrypt.verify(password, user.digest):
+    # lower(email) = $1 is served by the uniq_users_lower_email expression index
+    user = await User.annotate(email_lower=Lower("email")).filter(email_lower=email.strip().lower()).first()
+    if not user or not await user.verify_password(password):
         return JSONResponse({"error": "Invalid login"}, status_code = 401)
-    request.session["user_id"] = user.id
-    return RedirectResponse(url = "/dashboard", status_code = 302)
+    session = await session_manager.create_session(user.user_id)
+    # Upgrade outdated digests after the response is sent
+    background = BackgroundTask(user.upgrade_password, password) if user.needs_rehash() else None
+    response = RedirectResponse(url = "/dashboard", status_code = 302, background = background)
+    response.set_cookie(config.SESSION_COOKIE, session.id, max_age = config.SESSION_TTL_SECONDS, httponly = True, samesite = "lax")
+    return response
 
 @router.get("/logout")
-async def logout(request: Request):
-    request.session.clear()
-    return RedirectResponse(url = "/login", status_code = 302)
+async def logout(
+    session: Session | None = Depends(get_session),
+    session_manager: SessionManager = Depends(get_session_manager),
+):
+    if session:
+        await session_manager.delete_session(session.id)
+    response = RedirectResponse(url = "/login", status_code = 302)
+    response.delete_cookie(config.SESSION_COOKIE)
+    return response
 #-----------------USERDATA------------------------
 @router.get("/me")
-async def get_me(request: Request):
-    session = Session(request)
-    data = await session.get_session()
-    if not data:
+async def get_me(session: Session | None = Depends(get_session)):
+    if not session:
         return JSONResponse({"error": "Not authenticated"}, status_code = 401)
-    return JSONResponse({"user": data})
\ No newline at end of file
+    return JSONResponse({"user": session.data})
\ No newline at end of file
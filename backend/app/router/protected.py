@@ -1,24 +1,55 @@
 # Libraries
-from fastapi import APIRouter, Form, Depends
-from fastapi.templating import Jinja2Templates
+from fastapi import APIRouter, Form, Depends, Query
 from starlette.requests import Request
-from starlette.responses import JSONResponse
-from passlib.hash import bcrypt
 from tortoise.exceptions import IntegrityError
 # Application Code
+from backend import config
 from backend.config import app
+from backend.templating import templates
+from backend.responses import JSONResponse
 from backend.app.models import User, Game
 from backend.context import UserCtx
 from backend.dependencies import get_current_user
+from backend.dashboard import dashboard_cache, fetch_dashboard_page
+from backend.stats import game_stats
+from backend.conditional import Validator
 
 router = APIRouter(prefix="", tags=[""])
-templates = Jinja2Templates(directory = "backend/public/html")
 #------------------------DASHBOARD----------------------------
 @router.get("/dashboard")
-async def dashboard(request: Request, ctx: UserCtx = Depends(get_current_user)):
-    # Query all games by owner
-    games = await Game.filter(owner_id = ctx.user.user_id).all()
-    return templates.TemplateResponse("dashboard.html", {"request":request, "user":ctx.user, "games":games,})
+async def dashboard(
+    request: Request,
+    ctx: UserCtx = Depends(get_current_user),
+    page: int = Query(1, ge=1),
+    sort: str = Query("status", pattern="^(status|platform|rating|title)$"),
+    order: str = Query("asc", pattern="^(asc|desc)$"),
+):
+    user_id = ctx.user.user_id
+    size = config.DASHBOARD_PAGE_SIZE
+    # Checked before any query or render; per-user, so private and Vary: Cookie
+    etag = await dashboard_cache.etag(user_id, sort, order, page, size)
+    validator = Validator(request, etag, private=True) if etag else None
+    if validator and validator.not_modified():
+        return validator.not_modified_response()
+
+    async def render_table() -> str:
+        # Only the displayed columns of one page, as dicts
+        games, has_next = await fetch_dashboard_page(user_id, sort, order, page, size)
+        return templates.get_template("_games_table.html").render(
+            games=games, page=page, sort=sort, order=order, has_next=has_next,
+        )
+
+    games_table = await dashboard_cache.get_or_render(user_id, sort, order, page, size, render_table)
+    stats = await game_stats.get(user_id)
+    # The table is already rendered (usually from cache), so the page around it is
+    # small and rendered in one piece; streaming would not get anything out sooner
+    response = templates.TemplateResponse("dashboard.html", {"request":request, "user":ctx.user, "games_table":games_table, "stats":stats,})
+    return validator.apply(response) if validator else response
+#------------------------STATS--------------------------------
+@router.get("/private/stats")
+async def private_stats(ctx: UserCtx = Depends(get_current_user)):
+    # One HGETALL of a precomputed hash
+    return JSONResponse(await game_stats.get(ctx.user.user_id))
 #------------------------PROFILE------------------------------
 @router.get("/private/profile")
 async def private_profile(request: Request, ctx: UserCtx = Depends(get_current_user)):
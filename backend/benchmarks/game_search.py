@@ -0,0 +1,121 @@
+"""
+Query latency benchmark for /games/search.
+
+Loads a synthetic library (1M rows by default) into a scratch table with
+the same columns and pg_trgm indexes as `games`, then runs typical searches
+(prefix, typo, category, platform, no match) and prints p50/p95/p99 per query.
+The Redis cache is bypassed so every run hits Postgres.
+
+Needs a live Postgres with the pg_trgm extension available, configured like
+pg_script.py (USER, PASSWORD, DB, HOST, DB_PORT environment variables):
+
+    python -m backend.benchmarks.game_search --rows 1000000
+"""
+# Python
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import time
+# Application Code
+from backend.postgres.postgres import PostgresAdapter
+from backend.search import search_games
+
+TABLE = "bench_game_search"
+
+ADJECTIVES = ("Super", "Dark", "Final", "Legend of", "Tiny", "Eternal", "Crimson", "Hollow", "Neon", "Silent")
+NOUNS = ("Zelda", "Knight", "Fantasy", "Racer", "Souls", "Kart", "Odyssey", "Frontier", "Tactics", "Quest")
+CATEGORIES = ("RPG", "Platformer", "Racing", "Shooter", "Puzzle", "Strategy", "Roguelike", "Sports")
+PLATFORMS = ("PC", "PS5", "PS4", "Switch", "Xbox Series X", "Steam Deck")
+QUERIES = ("zel", "zelda", "zleda", "final fantasy", "roguelike", "switch", "knight 4242", "qqqxyz")
+
+
+def library(rows: int):
+    rng = random.Random(42)
+    for i in range(rows):
+        yield {
+            "game_id": i + 1,
+            "gameTitle": f"{rng.choice(ADJECTIVES)} {rng.choice(NOUNS)} {i}",
+            "category": rng.choice(CATEGORIES),
+            "platform": rng.choice(PLATFORMS),
+            "status": "Wishlist",
+            "rating": rng.randint(0, 10),
+        }
+
+
+async def load(db: PostgresAdapter, rows: int) -> None:
+    await db.exec("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    await db.exec(f"DROP TABLE IF EXISTS {TABLE}")
+    await db.exec(f"""
+        CREATE TABLE {TABLE} (
+            game_id INT PRIMARY KEY,
+            "gameTitle" VARCHAR(50) NOT NULL,
+            category VARCHAR(50) NOT NULL,
+            platform VARCHAR(50) NOT NULL,
+            status VARCHAR(50) NOT NULL,
+            rating INT
+        )
+    """)
+    start = time.perf_counter()
+    await db.bulk_insert(TABLE, library(rows), chunk_size=50000, method="copy")
+    print(f"loaded {rows} rows in {time.perf_counter() - start:.1f}s")
+
+    start = time.perf_counter()
+    for column in ("gameTitle", "category", "platform"):
+        await db.exec(f'CREATE INDEX ON {TABLE} USING gin ("{column}" gin_trgm_ops)')
+    await db.exec(f"ANALYZE {TABLE}")
+    print(f"built trigram indexes in {time.perf_counter() - start:.1f}s")
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--runs", type=int, default=50, help="timed runs per query")
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--keep", action="store_true", help="leave the table in place afterwards")
+    parser.add_argument("--reuse", action="store_true", help="skip loading, use a table left by --keep")
+    args = parser.parse_args()
+
+    db = PostgresAdapter()
+    await db.create_pool({
+        "user": os.getenv("USER"),
+        "password": os.getenv("PASSWORD"),
+        "database": os.getenv("DB"),
+        "host": os.getenv("HOST"),
+        "port": os.getenv("DB_PORT"),
+    })
+    try:
+        if not args.reuse:
+            await load(db, args.rows)
+
+        print(f"{'query':>16} {'hits':>5} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'page2 p50':>10}")
+        for q in QUERIES:
+            first, second = [], []
+            for _ in range(args.runs):
+                start = time.perf_counter()
+                page = await search_games(db, q, args.limit, table=TABLE)
+                first.append((time.perf_counter() - start) * 1000)
+                if page["next"]:
+                    start = time.perf_counter()
+                    await search_games(db, q, args.limit, after=page["next"], table=TABLE)
+                    second.append((time.perf_counter() - start) * 1000)
+            page2 = f"{statistics.median(second):10.2f}" if second else f"{'-':>10}"
+            print(
+                f"{q:>16} {len(page['games']):>5} {percentile(first, 50):8.2f} "
+                f"{percentile(first, 95):8.2f} {percentile(first, 99):8.2f} {page2}"
+            )
+    finally:
+        if not args.keep:
+            await db.exec(f"DROP TABLE IF EXISTS {TABLE}")
+        await db.close()
+
+
+# Run the async entrypoint
+if __name__ == "__main__":
+    asyncio.run(main())
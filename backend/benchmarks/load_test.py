@@ -0,0 +1,317 @@
+"""
+In-process load test of the whole app.
+
+Drives the ASGI `app` from backend/main.py through httpx's ASGI transport,
+`--concurrency` virtual users at a time, in two timed phases: every user
+signs up, then every user logs in and browses dashboard (including an ETag
+revalidation) -> stats -> /games -> /user. Games are seeded between the
+phases, outside both timed windows, so throughput reflects requests only.
+By default the app runs against local stand-ins (see standins.py): Tortoise
+on in-memory SQLite and an in-memory Redis. `--db postgres` / `--redis real`
+use DATABASE_URL / REDIS_URL instead. Rate limits are disabled (every
+virtual user shares one client address) and argon2 runs at its cheapest
+unless `--real-hash` is given.
+
+Prints a per-route table (throughput, p50/p95/p99) to stderr and a JSON
+report to stdout or `--out`. Given `--baseline` (an earlier report), it also
+prints the change per route and exits 1 if any p95 regressed by more than
+`--tolerance`:
+
+    python -m backend.benchmarks.load_test --users 200 --concurrency 20 --out after.json
+    python -m backend.benchmarks.load_test --users 200 --concurrency 20 --baseline before.json
+"""
+# Python
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+STAND_IN_ENV = {
+    "DB_MIGRATE_ON_STARTUP": "generate",
+    "STATS_RECONCILE_INTERVAL": "0",
+    "RATE_LIMIT_LOGIN_PER_IP": "0",
+    "RATE_LIMIT_LOGIN_PER_EMAIL": "0",
+    "RATE_LIMIT_SIGNUP_PER_IP": "0",
+}
+CHEAP_HASH_ENV = {
+    "PASSWORD_HASH_TIME_COST": "1",
+    "PASSWORD_HASH_MEMORY_KIB": "8192",
+}
+PLATFORMS = ("PC", "PS5", "Switch", "Xbox")
+STATUSES = ("Wishlist", "Playing", "Completed", "Dropped")
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))
+    return ordered[index]
+
+
+class Recorder:
+    """Latency samples and status counts per route label."""
+
+    def __init__(self):
+        self.samples: dict[str, list[float]] = {}
+        self.statuses: dict[str, dict[int, int]] = {}
+        self.errors: dict[str, int] = {}
+
+    async def request(self, client, label: str, method: str, url: str, expect: tuple[int, ...], **kwargs):
+        start = time.perf_counter()
+        response = await client.request(method, url, **kwargs)
+        self.samples.setdefault(label, []).append((time.perf_counter() - start) * 1000)
+        statuses = self.statuses.setdefault(label, {})
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+        if response.status_code not in expect:
+            self.errors[label] = self.errors.get(label, 0) + 1
+        return response
+
+    def routes(self, seconds: float) -> dict:
+        """Per-route figures, with throughput over this recorder's `seconds` timed window."""
+        routes = {}
+        for label, samples in self.samples.items():
+            routes[label] = {
+                "requests": len(samples),
+                "errors": self.errors.get(label, 0),
+                "statuses": {str(code): n for code, n in sorted(self.statuses[label].items())},
+                "throughput_rps": len(samples) / seconds,
+                "mean_ms": sum(samples) / len(samples),
+                "p50_ms": percentile(samples, 50),
+                "p95_ms": percentile(samples, 95),
+                "p99_ms": percentile(samples, 99),
+            }
+        return routes
+
+
+def build_report(phases: list[tuple[Recorder, float]]) -> dict:
+    """Merge timed phases; total throughput is over their summed windows (seeding excluded)."""
+    routes = {}
+    for recorder, seconds in phases:
+        routes.update(recorder.routes(seconds))
+    requests = sum(route["requests"] for route in routes.values())
+    seconds = sum(seconds for _, seconds in phases)
+    return {
+        "total": {
+            "requests": requests,
+            "errors": sum(route["errors"] for route in routes.values()),
+            "seconds": seconds,
+            "throughput_rps": requests / seconds,
+        },
+        "routes": routes,
+    }
+
+
+async def seed_games(username: str, games: int) -> None:
+    # Inserted directly (not timed) so the dashboard has something to page through.
+    # bulk_create skips the Game signals: the dashboard version is bumped here,
+    # and the stats hash is built from Postgres on the first stats read, which
+    # comes after seeding.
+    from backend.app.models import Game, User
+    from backend.dashboard import games_version
+
+    user = await User.get(username=username)
+    await Game.bulk_create([
+        Game(
+            gameTitle=f"{username} game {j}",
+            category=f"Genre {j % 7}",
+            platform=PLATFORMS[j % len(PLATFORMS)],
+            status=STATUSES[j % len(STATUSES)],
+            rating=j % 11 or None,
+            owner_id=user.user_id,
+        )
+        for j in range(games)
+    ])
+    await games_version.bump(user.user_id)
+
+
+async def check_database() -> None:
+    # The lifespan only logs a failed Tortoise.init; timing the error responses would be meaningless
+    from backend.app.models import User
+
+    try:
+        await User.exists()
+    except Exception as e:
+        raise SystemExit(f"Database is not initialized, see the lifespan log above: {e!r}")
+
+
+PASSWORD = "correct horse battery staple"
+
+
+async def sign_up(transport, recorder: Recorder, n: int, args) -> None:
+    import httpx
+
+    username = f"bench{n}"
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await recorder.request(client, "POST /signup", "POST", "/signup", (303,), data={
+            "fname": "Bench", "lname": str(n), "email": f"{username}@example.com", "username": username,
+            "password": PASSWORD, "password_confirmation": PASSWORD,
+        })
+
+
+async def browse(transport, recorder: Recorder, n: int, args) -> None:
+    import httpx
+
+    username = f"bench{n}"
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await recorder.request(client, "POST /login", "POST", "/login", (302,), data={
+            "email": f"{username}@example.com", "password": PASSWORD,
+        })
+        for i in range(args.iterations):
+            sort = ("status", "platform", "rating")[i % 3]
+            response = await recorder.request(
+                client, "GET /dashboard", "GET", f"/dashboard?sort={sort}", (200,)
+            )
+            etag = response.headers.get("etag")
+            if etag:
+                await recorder.request(
+                    client, "GET /dashboard (revalidate)", "GET", f"/dashboard?sort={sort}", (304,),
+                    headers={"If-None-Match": etag},
+                )
+            await recorder.request(client, "GET /private/stats", "GET", "/private/stats", (200,))
+            await recorder.request(client, "GET /games", "GET", "/games?limit=50", (200,))
+            await recorder.request(client, "GET /user", "GET", "/user?limit=50", (200,))
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(report: dict, baseline: dict, tolerance: float) -> bool:
+    """Print per-route changes against a baseline report; True if any p95 regressed."""
+    regressed = False
+    print(f"\n{'route':>28} {'p95 before':>11} {'p95 after':>10} {'change':>8} {'rps change':>11}", file=sys.stderr)
+    for label, after in report["routes"].items():
+        before = baseline.get("routes", {}).get(label)
+        if before is None:
+            continue
+        p95_change = (after["p95_ms"] - before["p95_ms"]) / before["p95_ms"] * 100 if before["p95_ms"] else 0.0
+        rps_change = (after["throughput_rps"] - before["throughput_rps"]) / before["throughput_rps"] * 100
+        flag = " REGRESSION" if p95_change > tolerance else ""
+        regressed = regressed or bool(flag)
+        print(
+            f"{label:>28} {before['p95_ms']:>11.2f} {after['p95_ms']:>10.2f} {p95_change:>+7.1f}% "
+            f"{rps_change:>+10.1f}%{flag}",
+            file=sys.stderr,
+        )
+    return regressed
+
+
+async def run(args) -> dict:
+    import httpx
+    from backend.main import app
+
+    if args.db == "sqlite":
+        from backend.benchmarks.standins import SQLiteAdapter
+        app.state.db = SQLiteAdapter()
+    if args.redis == "fake":
+        from backend.benchmarks.standins import FakeRedisAdapter
+        app.state.kv_store = FakeRedisAdapter()
+
+    async with app.router.lifespan_context(app):
+        deadline = time.perf_counter() + 30
+        while not app.state.ready and time.perf_counter() < deadline:
+            await asyncio.sleep(0.01)
+        await check_database()
+
+        transport = httpx.ASGITransport(app=app)
+        gate = asyncio.Semaphore(args.concurrency)
+
+        async def timed_phase(script) -> tuple[Recorder, float]:
+            recorder = Recorder()
+
+            async def user(n: int):
+                async with gate:
+                    await script(transport, recorder, n, args)
+
+            start = time.perf_counter()
+            await asyncio.gather(*(user(n) for n in range(args.users)))
+            return recorder, time.perf_counter() - start
+
+        signups = await timed_phase(sign_up)
+        if args.games_per_user:
+            async def seed(n: int):
+                async with gate:
+                    await seed_games(f"bench{n}", args.games_per_user)
+
+            await asyncio.gather(*(seed(n) for n in range(args.users)))
+        browsing = await timed_phase(browse)
+
+    report = build_report([signups, browsing])
+    report["meta"] = {
+        "commit": git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "db": args.db,
+        "redis": args.redis,
+        "users": args.users,
+        "concurrency": args.concurrency,
+        "iterations": args.iterations,
+        "games_per_user": args.games_per_user,
+        "real_hash": args.real_hash,
+    }
+    return report
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=100, help="virtual users in total")
+    parser.add_argument("--concurrency", type=int, default=10, help="virtual users running at once")
+    parser.add_argument("--iterations", type=int, default=5, help="dashboard/games rounds per user")
+    parser.add_argument("--games-per-user", type=int, default=200)
+    parser.add_argument("--db", choices=["sqlite", "postgres"], default="sqlite")
+    parser.add_argument("--redis", choices=["fake", "real"], default="fake")
+    parser.add_argument("--real-hash", action="store_true", help="keep the production argon2 cost")
+    parser.add_argument("--out", help="write the JSON report here instead of stdout")
+    parser.add_argument("--baseline", help="earlier JSON report to compare against")
+    parser.add_argument("--tolerance", type=float, default=10.0, help="allowed p95 regression in percent")
+    args = parser.parse_args()
+
+    # Settings are read when backend.config is first imported, so set them before that
+    env = dict(STAND_IN_ENV)
+    if args.db == "sqlite":
+        env["DATABASE_URL"] = "sqlite://:memory:"
+    if not args.real_hash:
+        env.update(CHEAP_HASH_ENV)
+    for name, value in env.items():
+        os.environ[name] = value
+
+    report = asyncio.run(run(args))
+
+    print(f"{'route':>28} {'requests':>9} {'errors':>7} {'rps':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}",
+          file=sys.stderr)
+    for label, route in report["routes"].items():
+        print(
+            f"{label:>28} {route['requests']:>9} {route['errors']:>7} {route['throughput_rps']:>9.1f} "
+            f"{route['p50_ms']:>8.2f} {route['p95_ms']:>8.2f} {route['p99_ms']:>8.2f}",
+            file=sys.stderr,
+        )
+    total = report["total"]
+    print(f"{'total':>28} {total['requests']:>9} {total['errors']:>7} {total['throughput_rps']:>9.1f}",
+          file=sys.stderr)
+
+    output = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if compare(report, baseline, args.tolerance):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
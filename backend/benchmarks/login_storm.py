@@ -0,0 +1,116 @@
+"""
+Login-storm benchmark for the password hasher.
+
+Fires a burst of argon2 hashes (what /signup and /login do) while a second
+client keeps hitting an unrelated, trivial route, and reports the latency
+percentiles of that unrelated route. It runs twice: once hashing inline on
+the event loop (the old behaviour) and once through `PasswordHasher`.
+
+Runs fully in-process through httpx's ASGI transport, no servers needed:
+
+    python -m backend.benchmarks.login_storm --logins 200 --concurrency 50
+"""
+# Python
+import argparse
+import asyncio
+import statistics
+import time
+# Libraries
+import httpx
+from fastapi import FastAPI
+from passlib.hash import argon2
+# Application Code
+from backend.hashing import PasswordHasher
+
+
+def build_app(hasher: PasswordHasher | None) -> FastAPI:
+    bench_app = FastAPI()
+
+    @bench_app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    @bench_app.post("/hash")
+    async def do_hash():
+        if hasher is None:
+            argon2.hash("correct horse battery staple")
+        else:
+            await hasher.hash("correct horse battery staple")
+        return {"ok": True}
+
+    return bench_app
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))
+    return ordered[index]
+
+
+async def run(hasher: PasswordHasher | None, logins: int, concurrency: int) -> dict:
+    transport = httpx.ASGITransport(app=build_app(hasher))
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        gate = asyncio.Semaphore(concurrency)
+        storm_done = asyncio.Event()
+        statuses: dict[int, int] = {}
+        ping_latencies: list[float] = []
+
+        async def login():
+            async with gate:
+                response = await client.post("/hash")
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+        async def pinger():
+            while not storm_done.is_set():
+                start = time.perf_counter()
+                await client.get("/ping")
+                ping_latencies.append((time.perf_counter() - start) * 1000)
+                await asyncio.sleep(0.005)
+
+        ping_task = asyncio.create_task(pinger())
+        start = time.perf_counter()
+        await asyncio.gather(*(login() for _ in range(logins)))
+        elapsed = time.perf_counter() - start
+        storm_done.set()
+        await ping_task
+
+    return {
+        "storm_seconds": elapsed,
+        "login_statuses": statuses,
+        "ping_samples": len(ping_latencies),
+        "ping_p50_ms": statistics.median(ping_latencies) if ping_latencies else 0.0,
+        "ping_p99_ms": percentile(ping_latencies, 99) if ping_latencies else 0.0,
+        "ping_max_ms": max(ping_latencies, default=0.0),
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--max-queue", type=int, default=64)
+    parser.add_argument("--mode", choices=["thread", "process"], default="thread")
+    args = parser.parse_args()
+
+    inline = await run(None, args.logins, args.concurrency)
+
+    pooled_hasher = PasswordHasher(args.mode, args.workers, args.max_queue)
+    pooled_hasher.start()
+    try:
+        pooled = await run(pooled_hasher, args.logins, args.concurrency)
+    finally:
+        pooled_hasher.shutdown()
+
+    for label, result in (("inline", inline), (f"pool[{args.mode}]", pooled)):
+        print(
+            f"{label:>14}: storm {result['storm_seconds']:.2f}s "
+            f"statuses={result['login_statuses']} | /ping n={result['ping_samples']} "
+            f"p50={result['ping_p50_ms']:.1f}ms p99={result['ping_p99_ms']:.1f}ms "
+            f"max={result['ping_max_ms']:.1f}ms"
+        )
+
+
+# Run the async entrypoint
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,105 @@
+"""
+Bulk load benchmark for PostgresAdapter.
+
+Loads the same synthetic game catalog three ways into a scratch table and
+prints rows/second for each: one `insert()` per row, `bulk_insert()` with
+chunked executemany, and `bulk_insert()` with binary COPY.
+
+Needs a live Postgres, configured like pg_script.py (USER, PASSWORD, DB,
+HOST, DB_PORT environment variables):
+
+    python -m backend.benchmarks.pg_bulk_insert --rows 20000
+"""
+# Python
+import argparse
+import asyncio
+import os
+import time
+# Application Code
+from backend.postgres.postgres import PostgresAdapter
+
+TABLE = "bench_games"
+
+
+def catalog(rows: int):
+    platforms = ("PC", "PS5", "Switch", "Xbox")
+    for i in range(rows):
+        yield {
+            "gameTitle": f"Game {i}",
+            "category": f"Genre {i % 17}",
+            "platform": platforms[i % len(platforms)],
+            "status": "Wishlist",
+            "rating": i % 10,
+        }
+
+
+async def reset(db: PostgresAdapter) -> None:
+    await db.exec(f"DROP TABLE IF EXISTS {TABLE}")
+    await db.exec(f"""
+        CREATE TABLE {TABLE} (
+            game_id SERIAL PRIMARY KEY,
+            "gameTitle" VARCHAR(50) NOT NULL UNIQUE,
+            category VARCHAR(50) NOT NULL,
+            platform VARCHAR(50) NOT NULL,
+            status VARCHAR(50) NOT NULL DEFAULT 'Wishlist',
+            rating INT
+        )
+    """)
+
+
+async def timed(label: str, rows: int, coro) -> None:
+    start = time.perf_counter()
+    await coro
+    elapsed = time.perf_counter() - start
+    print(f"{label:>22}: {rows} rows in {elapsed:.2f}s ({rows / elapsed:,.0f} rows/s)")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--per-row-rows", type=int, default=2000,
+                        help="rows for the (slow) per-row insert run")
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    args = parser.parse_args()
+
+    db = PostgresAdapter()
+    await db.create_pool({
+        "user": os.getenv("USER"),
+        "password": os.getenv("PASSWORD"),
+        "database": os.getenv("DB"),
+        "host": os.getenv("HOST"),
+        "port": os.getenv("DB_PORT"),
+    })
+    try:
+        await reset(db)
+
+        async def per_row():
+            for record in catalog(args.per_row_rows):
+                await db.insert(TABLE, record)
+
+        await timed("insert() per row", args.per_row_rows, per_row())
+
+        for method in ("executemany", "copy"):
+            await reset(db)
+            await timed(
+                f"bulk_insert({method})",
+                args.rows,
+                db.bulk_insert(TABLE, catalog(args.rows), chunk_size=args.chunk_size, method=method),
+            )
+
+        await timed(
+            "bulk_insert(copy upsert)",
+            args.rows,
+            db.bulk_insert(
+                TABLE, catalog(args.rows), chunk_size=args.chunk_size, method="copy",
+                conflict_target=["gameTitle"], on_conflict="update",
+            ),
+        )
+    finally:
+        await db.exec(f"DROP TABLE IF EXISTS {TABLE}")
+        await db.close()
+
+
+# Run the async entrypoint
+if __name__ == "__main__":
+    asyncio.run(main())
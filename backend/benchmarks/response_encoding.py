@@ -0,0 +1,119 @@
+"""
+Before/after benchmark for JSON serialization and response compression.
+
+Serves the same game list (with created_at/updated_at datetimes) through
+Starlette's stdlib JSONResponse and through the app's orjson JSONResponse,
+with and without CompressionMiddleware, plus a streamed ndjson export.
+It reports bytes on the wire and CPU time per request.
+
+Runs fully in-process through httpx's ASGI transport, no servers needed:
+
+    python -m backend.benchmarks.response_encoding --games 5000 --requests 200
+"""
+# Python
+import argparse
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+# Libraries
+import httpx
+from fastapi import FastAPI
+from starlette.responses import JSONResponse as StdlibJSONResponse, StreamingResponse
+# Application Code
+from backend.compression import CompressionMiddleware, brotli
+from backend.responses import JSONResponse, dumps
+
+
+def library(games: int) -> list[dict]:
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    return [
+        {
+            "game_id": i,
+            "gameTitle": f"Game {i}",
+            "category": f"Genre {i % 17}",
+            "platform": ("PC", "PS5", "Switch", "Xbox")[i % 4],
+            "status": "Wishlist",
+            "rating": i % 10,
+            "created_at": start + timedelta(minutes=i),
+            "updated_at": start + timedelta(minutes=2 * i),
+        }
+        for i in range(games)
+    ]
+
+
+def build_app(games: list[dict], compress: bool) -> FastAPI:
+    bench_app = FastAPI()
+
+    @bench_app.get("/stdlib")
+    async def stdlib():
+        # The stdlib encoder cannot serialize datetimes; convert first as routes had to
+        rows = [{**g, "created_at": g["created_at"].isoformat(), "updated_at": g["updated_at"].isoformat()}
+                for g in games]
+        return StdlibJSONResponse({"games": rows})
+
+    @bench_app.get("/orjson")
+    async def fast():
+        return JSONResponse({"games": games})
+
+    @bench_app.get("/ndjson")
+    async def ndjson():
+        async def chunks():
+            for i in range(0, len(games), 1000):
+                yield b"".join(dumps(g) + b"\n" for g in games[i:i + 1000])
+        return StreamingResponse(chunks(), media_type="application/x-ndjson")
+
+    if compress:
+        bench_app.add_middleware(CompressionMiddleware, minimum_size=1024)
+    return bench_app
+
+
+async def measure(app: FastAPI, path: str, encoding: str, requests: int) -> tuple[float, float]:
+    transport = httpx.ASGITransport(app=app)
+    headers = {"Accept-Encoding": encoding}
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+
+        async def fetch() -> int:
+            # Raw bytes: the client does not spend CPU decompressing
+            async with client.stream("GET", path, headers=headers) as response:
+                async for _ in response.aiter_raw():
+                    pass
+                return response.num_bytes_downloaded
+
+        await fetch()
+        cpu_start = time.process_time()
+        for _ in range(requests):
+            wire = await fetch()
+        cpu = (time.process_time() - cpu_start) / requests * 1000
+    return wire, cpu
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--games", type=int, default=5000)
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    games = library(args.games)
+    plain = build_app(games, compress=False)
+    compressed = build_app(games, compress=True)
+    runs = [
+        ("stdlib json (before)", plain, "/stdlib", "identity"),
+        ("orjson", plain, "/orjson", "identity"),
+        ("orjson + gzip", compressed, "/orjson", "gzip"),
+        ("ndjson stream", plain, "/ndjson", "identity"),
+        ("ndjson stream + gzip", compressed, "/ndjson", "gzip"),
+    ]
+    if brotli is not None:
+        runs.insert(3, ("orjson + br", compressed, "/orjson", "br"))
+        runs.append(("ndjson stream + br", compressed, "/ndjson", "br"))
+
+    print(f"{args.games} games, {args.requests} requests each")
+    print(f"{'response':>24} {'bytes on wire':>14} {'CPU ms/request':>15}")
+    for label, app, path, encoding in runs:
+        wire, cpu = await measure(app, path, encoding, args.requests)
+        print(f"{label:>24} {wire:>14,} {cpu:>15.2f}")
+
+
+# Run the async entrypoint
+if __name__ == "__main__":
+    asyncio.run(main())
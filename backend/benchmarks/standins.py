@@ -0,0 +1,65 @@
+"""
+Local stand-ins for Redis and Postgres, used by the in-process load test.
+
+`FakeRedisAdapter` is the real `RedisAdapter` on top of fakeredis' in-memory
+server (Lua scripts, pipelines, WATCH and pub/sub included), so every code
+path above the connection is the production one. Needs
+`pip install "fakeredis[lua]"`.
+
+`SQLiteAdapter` answers the `PostgresAdapter.fetch` calls the app makes
+(the stats rebuild, /ready) through Tortoise's SQLite connection,
+rewriting `$n` placeholders and dropping `::type` casts. Postgres-only
+features (trigram search, COPY, cursors) are not available on it.
+"""
+# Python
+import re
+from datetime import datetime
+from typing import Any
+# Application Code
+from backend.redis.redis import KeyBuilder, RedisAdapter
+
+_PLACEHOLDER = re.compile(r"\$(\d+)")
+_CAST = re.compile(r"::\w+")
+_TIMESTAMP = re.compile(r"^\d{4}-\d{2}-\d{2}[ T]\d{2}:\d{2}")
+
+
+class FakeRedisAdapter(RedisAdapter):
+    """RedisAdapter backed by an in-process fakeredis server."""
+
+    def __init__(self, tenant: str = "bench"):
+        try:
+            import fakeredis
+        except ImportError as e:
+            raise RuntimeError('The in-memory Redis stand-in needs: pip install "fakeredis[lua]"') from e
+        self.conn = fakeredis.FakeAsyncRedis(decode_responses=True)
+        self.coalescer = None
+        self.key = KeyBuilder(tenant)
+
+
+def _to_python(value: Any) -> Any:
+    # SQLite hands timestamps back as ISO strings; asyncpg would return datetimes
+    if isinstance(value, str) and _TIMESTAMP.match(value):
+        try:
+            return datetime.fromisoformat(value)
+        except ValueError:
+            return value
+    return value
+
+
+class SQLiteAdapter:
+    """The subset of PostgresAdapter the request path uses, over Tortoise's default connection."""
+
+    pool = None
+
+    async def create_pool(self, *args, **kwargs) -> None:
+        pass
+
+    async def close(self) -> None:
+        pass
+
+    async def fetch(self, query: str, *args: Any) -> list[dict[str, Any]]:
+        from tortoise import connections
+
+        sql = _CAST.sub("", _PLACEHOLDER.sub(r"?\1", query))
+        rows = await connections.get("default").execute_query_dict(sql, list(args))
+        return [{name: _to_python(value) for name, value in row.items()} for row in rows]
@@ -0,0 +1,53 @@
+# Python
+import time
+from collections import OrderedDict
+from typing import Any, Hashable
+
+
+class LocalCache:
+    """
+    Small in-process cache with a per-entry TTL and LRU eviction.
+
+    Not thread-safe; it is meant to be used from a single event loop.
+
+    Attributes:
+        maxsize (int): Maximum number of entries before the least recently used is dropped.
+        ttl (float): Default time-to-live of an entry in seconds.
+    """
+
+    def __init__(self, maxsize: int = 10000, ttl: float = 30.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+
+    def get(self, key: Hashable) -> Any | None:
+        """Return the cached value, or None if missing or expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: float | None = None) -> None:
+        """Store a value, evicting the least recently used entry if full."""
+        if self.maxsize <= 0:
+            return
+        self._entries[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def delete(self, key: Hashable) -> None:
+        """Drop a key if present."""
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Drop every entry."""
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,167 @@
+# Python
+import zlib
+# Libraries
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # gzip only
+    brotli = None
+
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+)
+
+
+def negotiate(accept_encoding: str) -> str | None:
+    """
+    Pick "br" or "gzip" from an Accept-Encoding header, honouring q-values.
+
+    Brotli wins ties when the brotli package is installed.
+    """
+    offered = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        offered[coding.strip().lower()] = q
+    wildcard = offered.get("*", 0.0)
+    candidates = (("br", "gzip") if brotli is not None else ("gzip",))
+    best, best_q = None, 0.0
+    for coding in candidates:
+        q = offered.get(coding, wildcard)
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+class _Encoder:
+    def __init__(self, coding: str, gzip_level: int, brotli_quality: int):
+        if coding == "br":
+            self._compressor = brotli.Compressor(quality=brotli_quality)
+            self._process = self._compressor.process
+            self._flush = self._compressor.flush
+            self._finish = self._compressor.finish
+        else:
+            # wbits 16+ → gzip container
+            self._compressor = zlib.compressobj(gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+            self._process = self._compressor.compress
+            self._flush = lambda: self._compressor.flush(zlib.Z_SYNC_FLUSH)
+            self._finish = self._compressor.flush
+
+    def chunk(self, data: bytes) -> bytes:
+        """Compress and flush, so every streamed chunk reaches the client promptly."""
+        return self._process(data) + self._flush()
+
+    def last(self, data: bytes) -> bytes:
+        return self._process(data) + self._finish()
+
+
+class CompressionMiddleware:
+    """
+    Pure ASGI gzip/brotli response compression.
+
+    The encoding is negotiated from Accept-Encoding. Complete bodies smaller
+    than `minimum_size` are passed through untouched. Streamed bodies (more
+    than one body message) are compressed chunk by chunk and flushed after
+    each one, so StreamingResponse keeps streaming. Responses that are
+    already encoded, not a compressible type, or marked no-transform are
+    left alone.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        coding = negotiate(Headers(scope=scope).get("accept-encoding", ""))
+        if coding is None:
+            await self.app(scope, receive, send)
+            return
+        await _CompressedResponse(self, coding, send)(scope, receive)
+
+
+class _CompressedResponse:
+    def __init__(self, middleware: CompressionMiddleware, coding: str, send: Send):
+        self.middleware = middleware
+        self.coding = coding
+        self.send = send
+        self.start: Message | None = None
+        self.encoder: _Encoder | None = None
+        self.passthrough = False
+
+    async def __call__(self, scope: Scope, receive: Receive) -> None:
+        await self.middleware.app(scope, receive, self.on_send)
+
+    def _compressible(self, headers: MutableHeaders) -> bool:
+        if self.start["status"] in (204, 304) or "content-encoding" in headers:
+            return False
+        if "no-transform" in headers.get("cache-control", ""):
+            return False
+        return headers.get("content-type", "").startswith(COMPRESSIBLE_TYPES)
+
+    async def on_send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            # Held back until the first body chunk shows whether this is streamed
+            self.start = message
+            headers = MutableHeaders(scope=message)
+            if self._compressible(headers):
+                headers.add_vary_header("Accept-Encoding")
+            else:
+                self.passthrough = True
+            return
+
+        if message["type"] != "http.response.body":
+            await self.send(message)
+            return
+
+        if self.passthrough:
+            if self.start is not None:
+                await self.send(self.start)
+                self.start = None
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.start is not None:
+            headers = MutableHeaders(scope=self.start)
+            if not more_body and len(body) < self.middleware.minimum_size:
+                # Complete and small: not worth the CPU or the framing overhead
+                self.passthrough = True
+                await self.send(self.start)
+                self.start = None
+                await self.send(message)
+                return
+            self.encoder = _Encoder(self.coding, self.middleware.gzip_level, self.middleware.brotli_quality)
+            headers["Content-Encoding"] = self.coding
+            if more_body:
+                del headers["content-length"]
+                body = self.encoder.chunk(body)
+            else:
+                body = self.encoder.last(body)
+                headers["Content-Length"] = str(len(body))
+            await self.send(self.start)
+            self.start = None
+            await self.send({"type": "http.response.body", "body": body, "more_body": more_body})
+            return
+
+        body = self.encoder.chunk(body) if more_body else self.encoder.last(body)
+        await self.send({"type": "http.response.body", "body": body, "more_body": more_body})
@@ -0,0 +1,118 @@
+# Python
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any
+# Libraries
+from starlette.requests import Request
+from starlette.responses import Response
+from tortoise.functions import Count, Max
+from tortoise.queryset import QuerySet
+# Application Code
+from backend import config
+
+# Anonymous data may be stored by shared caches but must be revalidated;
+# per-user pages may only be kept by the browser, and also revalidated.
+PUBLIC_CACHE_CONTROL = "public, max-age=0, must-revalidate"
+PRIVATE_CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(*parts: Any) -> str:
+    """
+    Weak ETag over the parts that determine a response body.
+
+    Weak because the same content may be sent compressed or not. The
+    deployed APP_VERSION is always included so template changes invalidate.
+    """
+    digest = hashlib.sha1("\0".join(map(str, (config.APP_VERSION, *parts))).encode()).hexdigest()
+    return f'W/"{digest[:24]}"'
+
+
+def _opaque(tag: str) -> str:
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+class Validator:
+    """
+    Validators of one response, checked before any rows are loaded or templates rendered.
+
+    Example:
+        validator = Validator(request, make_etag(...), last_modified, private=True)
+        if validator.not_modified():
+            return validator.not_modified_response()
+        ...
+        return validator.apply(response)
+    """
+
+    def __init__(self, request: Request, etag: str, last_modified: datetime | None = None, private: bool = False):
+        self.request = request
+        self.etag = etag
+        self.last_modified = last_modified.replace(microsecond=0) if last_modified else None
+        self.private = private
+
+    def not_modified(self) -> bool:
+        """True if the client's cached copy is current (If-None-Match wins over If-Modified-Since)."""
+        if_none_match = self.request.headers.get("if-none-match")
+        if if_none_match is not None:
+            if if_none_match.strip() == "*":
+                return True
+            return _opaque(self.etag) in {_opaque(tag) for tag in if_none_match.split(",")}
+        # Coarser: a delete does not move Last-Modified, only the ETag
+        if_modified_since = self.request.headers.get("if-modified-since")
+        if if_modified_since and self.last_modified:
+            try:
+                since = parsedate_to_datetime(if_modified_since)
+            except (TypeError, ValueError):
+                return False
+            if since.tzinfo is None:
+                since = since.replace(tzinfo=timezone.utc)
+            return self.last_modified <= since
+        return False
+
+    @property
+    def headers(self) -> dict[str, str]:
+        headers = {
+            "ETag": self.etag,
+            "Cache-Control": PRIVATE_CACHE_CONTROL if self.private else PUBLIC_CACHE_CONTROL,
+        }
+        if self.private:
+            headers["Vary"] = "Cookie"
+        if self.last_modified:
+            headers["Last-Modified"] = format_datetime(self.last_modified.astimezone(timezone.utc), usegmt=True)
+        return headers
+
+    def not_modified_response(self) -> Response:
+        return Response(status_code=304, headers=self.headers)
+
+    def apply(self, response: Response) -> Response:
+        """Add the validator and caching headers to a full response."""
+        response.headers.update(self.headers)
+        return response
+
+
+async def table_state(queryset: QuerySet, pk: str) -> dict[str, Any]:
+    """
+    max(updated_at) and row count of a whole table, as one aggregate query.
+
+    Inserts and updates move max(updated_at); deletes change the count.
+    """
+    rows = await queryset.annotate(last=Max("updated_at"), n=Count(pk)).values("last", "n")
+    return rows[0] if rows else {"last": None, "n": 0}
+
+
+async def keyset_page_state(queryset: QuerySet, pk: str, after: Any, limit: int) -> dict[str, Any]:
+    """
+    Validator inputs for one `keyset_page`: max(updated_at), count and last pk of the page.
+
+    Walks only the page's index range and reads two columns, so a 304
+    costs far less than building and sending the page.
+    """
+    if after is not None:
+        queryset = queryset.filter(**{f"{pk}__gt": after})
+    rows = await queryset.order_by(pk).limit(limit).values_list(pk, "updated_at")
+    return {
+        "last": max((updated_at for _, updated_at in rows), default=None),
+        "n": len(rows),
+        "last_pk": rows[-1][0] if rows else None,
+    }
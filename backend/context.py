@@ -1,12 +1,12 @@
-from backend.app.models import User
+from backend.identity import UserIdentity
 from backend.session import Session
 
 class UserCtx: 
-    def __init__(self, user: User, session: Session):
+    def __init__(self, user: UserIdentity, session: Session):
         self.user = user
         self.session = session
 
 class AdminCtx:
-    def __init__(self, user: User, session: Session):
+    def __init__(self, user: UserIdentity, session: Session):
         self.user = user
         self.session = session
\ No newline at end of file
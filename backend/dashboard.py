@@ -0,0 +1,148 @@
+# Python
+import logging
+# Libraries
+from tortoise.signals import post_delete, post_save
+# Application Code
+from backend.app.models import Game
+from backend.conditional import make_etag
+from backend.identity import identity_cache
+
+logger = logging.getLogger(__name__)
+
+# Columns the dashboard table shows, in display order
+DASHBOARD_FIELDS = ("game_id", "gameTitle", "platform", "category", "status", "rating")
+# Sort keys accepted by /dashboard; game_id breaks ties so pages never overlap
+DASHBOARD_SORTS = {
+    "status": "status",
+    "platform": "platform",
+    "rating": "rating",
+    "title": "gameTitle",
+}
+
+
+class GamesVersion:
+    """
+    Per-user version counter (`games:<user id>:ver`) for a user's Game rows.
+
+    Bumped whenever one of the user's games is saved or deleted through
+    Tortoise. Anything derived from a user's games (such as the cached
+    dashboard table) includes the version in its key, so it stops being
+    served the moment the games change and simply expires later.
+    Queryset `.update()`/`.delete()` bypass signals and must call `bump` themselves.
+    """
+
+    def __init__(self):
+        self.redis = None
+
+    def bind(self, redis) -> None:
+        """Attach the Redis adapter. Called from the lifespan."""
+        self.redis = redis
+
+    def _key(self, user_id) -> str:
+        return self.redis.key("games", user_id, "ver")
+
+    async def get(self, user_id) -> int:
+        """The current version, 0 if the user's games never changed."""
+        return int(await self.redis.get(self._key(user_id)) or 0)
+
+    async def bump(self, user_id) -> None:
+        if self.redis is not None:
+            await self.redis.incr(self._key(user_id))
+
+
+class DashboardCache:
+    """
+    Rendered dashboard table fragments, per (user, games version, sort, page).
+
+    Attributes:
+        ttl (int): Seconds a fragment is kept. Superseded versions are never
+            read again and just age out.
+    """
+
+    def __init__(self, versions: GamesVersion, ttl: int = 600):
+        self.versions = versions
+        self.ttl = ttl
+
+    @property
+    def redis(self):
+        return self.versions.redis
+
+    async def _key(self, user_id, sort: str, order: str, page: int, size: int) -> str:
+        version = await self.versions.get(user_id)
+        return self.redis.key("dashboard", user_id, version, sort, order, page, size)
+
+    async def etag(self, user_id, sort: str, order: str, page: int, size: int) -> str | None:
+        """
+        ETag of a dashboard page, from the games and identity versions (one MGET).
+
+        Changes whenever the user's games or name change, without touching
+        Postgres. None if Redis is unavailable.
+        """
+        if self.redis is None:
+            return None
+        try:
+            games, identity = await self.redis.mget(
+                [self.versions._key(user_id), identity_cache.version_key(user_id)]
+            )
+        except Exception as e:
+            logger.warning("Dashboard versions unavailable for user %s: %s", user_id, e)
+            return None
+        return make_etag("dashboard", user_id, games or 0, identity or 0, sort, order, page, size)
+
+    async def get_or_render(self, user_id, sort: str, order: str, page: int, size: int, render) -> str:
+        """
+        Return the cached fragment, or await `render()` and cache its result.
+
+        Falls back to rendering on every request if Redis is unavailable.
+        """
+        if self.redis is None:
+            return await render()
+        try:
+            key = await self._key(user_id, sort, order, page, size)
+            html = await self.redis.get(key)
+        except Exception as e:
+            logger.warning("Dashboard cache unavailable for user %s: %s", user_id, e)
+            return await render()
+        if html is not None:
+            return html
+        # The key was built from the version read *before* the query, so a
+        # concurrent change leaves this fragment stale rather than current
+        html = await render()
+        try:
+            await self.redis.set(key, html, ex=self.ttl)
+        except Exception as e:
+            logger.warning("Failed to cache dashboard for user %s: %s", user_id, e)
+        return html
+
+
+games_version = GamesVersion()
+dashboard_cache = DashboardCache(games_version)
+
+
+async def fetch_dashboard_page(user_id, sort: str, order: str, page: int, size: int) -> tuple[list[dict], bool]:
+    """
+    One page of a user's games, projected to DASHBOARD_FIELDS.
+
+    Returns:
+        tuple[list[dict], bool]: The rows and whether another page follows.
+    """
+    column = DASHBOARD_SORTS[sort]
+    prefix = "-" if order == "desc" else ""
+    rows = await (
+        Game.filter(owner_id=user_id)
+        .order_by(f"{prefix}{column}", f"{prefix}game_id")
+        .offset((page - 1) * size)
+        .limit(size + 1)
+        .values(*DASHBOARD_FIELDS)
+    )
+    return rows[:size], len(rows) > size
+
+
+@post_save(Game)
+async def _game_saved(sender, instance, created, using_db, update_fields) -> None:
+    await games_version.bump(instance.owner_id)
+
+
+@post_delete(Game)
+async def _game_deleted(sender, instance, using_db) -> None:
+    await games_version.bump(instance.owner_id)
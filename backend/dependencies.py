@@ -1,40 +1,51 @@
+# Python
+import hmac
 # Libararies
 from fastapi import Depends, HTTPException
 from starlette.requests import Request
-from tortoise.exceptions import DoesNotExist
 # Application Code
+from backend import config
 from backend.redis.redis import RedisAdapter
+from backend.postgres.postgres import PostgresAdapter
 from backend.session import Session, SessionManager
 from backend.context import UserCtx, AdminCtx
-from backend.app.models import User
+from backend.identity import identity_cache
 
 def get_kv_store(request: Request) -> RedisAdapter:
     return request.app.state.kv_store
 
+def get_db(request: Request) -> PostgresAdapter:
+    return request.app.state.db
+
+def require_internal_token(request: Request) -> None:
+    # Operational endpoints expose internals: bearer INTERNAL_TOKEN only, and
+    # not served at all when no token is configured
+    if not config.INTERNAL_TOKEN:
+        raise HTTPException(status_code=404)
+    supplied = request.headers.get("authorization", "")
+    if not hmac.compare_digest(supplied.encode(), f"Bearer {config.INTERNAL_TOKEN}".encode()):
+        raise HTTPException(status_code=401, detail="Not authenticated", headers={"WWW-Authenticate": "Bearer"})
+
 def get_session_manager(request: Request) -> SessionManager:
     return request.app.state.session_manager
 
-def get_session(
+async def get_session(
     request: Request, session_manager: SessionManager = Depends(get_session_manager)
-) -> Session:
+) -> Session | None:
     if not hasattr(request.state, "session"):
-        request.state.session = Session(
-            request=request, session_manager=session_manager #Change
-        )
+        sid = request.cookies.get(config.SESSION_COOKIE)
+        request.state.session = await session_manager.get_session(sid) if sid else None
     return request.state.session
 
-async def get_current_user(request: Request, session: Session = Depends(get_session)):
-    await session.load()
-    if not session.data or not session.data.get("user_id"):
+async def get_current_user(request: Request, session: Session | None = Depends(get_session)):
+    if session is None or not session.user_id:
         raise HTTPException(status_code=303, headers={"location": "/"})
 
-    try:
-        user = await User.get(user_id=session.data["user_id"])
-        user = UserCtx(user, session)
-
-    except DoesNotExist as e:
-        raise HTTPException(status_code=303, headers={"location": "/"}) from e
-    return user
+    # Served from the identity cache: no SQL on the hot path
+    identity = await identity_cache.get(session.user_id)
+    if identity is None:
+        raise HTTPException(status_code=303, headers={"location": "/"})
+    return UserCtx(identity, session)
 
 def get_admin(request: Request, ctx: UserCtx = Depends(get_current_user)):
     try:
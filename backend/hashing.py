@@ -0,0 +1,124 @@
+# Python
+import asyncio
+import logging
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+# Libraries
+from fastapi import HTTPException
+# Application Code
+from backend import config
+from backend.password_policy import HashingPolicy, argon2_handler, policy, preload, verify_context
+
+logger = logging.getLogger(__name__)
+
+
+def _hash(raw_password: str, settings: dict[str, int]) -> str:
+    return argon2_handler().using(**settings).hash(raw_password)
+
+
+def _verify(raw_password: str, digest: str) -> bool:
+    try:
+        return verify_context().verify(raw_password, digest)
+    except ValueError:
+        # Digest is not a scheme we recognise (or is malformed)
+        return False
+
+
+class PasswordHasher:
+    """
+    Runs password hashing off the event loop on a bounded worker pool.
+
+    At most `workers` hashes run at once. Up to `max_queue` more callers may
+    wait for a slot; anything beyond that is rejected with a 503 so a login
+    burst cannot pile up unbounded work behind the pool.
+    """
+
+    def __init__(
+        self,
+        mode: str = "thread",
+        workers: int = 4,
+        max_queue: int = 64,
+        policy: HashingPolicy = policy,
+    ):
+        if mode not in ("thread", "process"):
+            raise ValueError(f"Unknown password hash pool mode: {mode}")
+        self.mode = mode
+        self.workers = workers
+        self.max_queue = max_queue
+        self.policy = policy
+        self._executor: Executor | None = None
+        self._slots = asyncio.Semaphore(workers)
+        self._pending = 0
+
+    @property
+    def pending(self) -> int:
+        """Number of hash/verify calls running or waiting for a slot."""
+        return self._pending
+
+    def start(self) -> None:
+        """Creates the worker pool. Called from the app lifespan."""
+        if self._executor is not None:
+            return
+        if self.mode == "thread":
+            preload()
+        if self.mode == "process":
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        else:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.workers, thread_name_prefix="pwhash"
+            )
+
+    def shutdown(self) -> None:
+        """Stops the worker pool, dropping calls that have not started."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def _submit(self, fn, *args):
+        if self._pending >= self.workers + self.max_queue:
+            logger.warning("Password hasher saturated (%d pending), shedding load", self._pending)
+            raise HTTPException(
+                status_code=503,
+                detail="Server busy, try again shortly",
+                headers={"Retry-After": "1"},
+            )
+        if self._executor is None:
+            self.start()
+
+        self._pending += 1
+        try:
+            async with self._slots:
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(self._executor, fn, *args)
+        finally:
+            self._pending -= 1
+
+    async def calibrate(self) -> None:
+        """
+        Tunes the unpinned costs of the policy to this host (nothing to do
+        when both are pinned in config).
+
+        Runs on a plain worker thread so startup never blocks the loop and
+        the calibration hashes are not counted against the request queue.
+        """
+        if self.policy.pin_time_cost and self.policy.pin_memory_cost:
+            return
+        await asyncio.get_running_loop().run_in_executor(None, self.policy.calibrate)
+
+    async def hash(self, raw_password: str) -> str:
+        """Hashes a password on the worker pool using the current policy."""
+        return await self._submit(_hash, raw_password, self.policy.settings)
+
+    async def verify(self, raw_password: str, digest: str) -> bool:
+        """Verifies a password against a digest (argon2 or legacy bcrypt) on the worker pool."""
+        return await self._submit(_verify, raw_password, digest)
+
+    def needs_rehash(self, digest: str) -> bool:
+        """True if the digest should be upgraded to the current policy."""
+        return self.policy.needs_update(digest)
+
+
+hasher = PasswordHasher(
+    mode=config.PASSWORD_HASH_POOL,
+    workers=config.PASSWORD_HASH_WORKERS,
+    max_queue=config.PASSWORD_HASH_MAX_QUEUE,
+)
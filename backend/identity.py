@@ -0,0 +1,143 @@
+# Python
+import json
+import logging
+from datetime import datetime
+# Libraries
+from tortoise.signals import post_delete, post_save
+# Application Code
+from backend.app.models import User
+from backend.cache import LocalCache
+
+logger = logging.getLogger(__name__)
+
+IDENTITY_FIELDS = ("user_id", "username", "fname", "lname", "activated_at")
+
+
+class UserIdentity:
+    """
+    The part of a User needed to authenticate a request and render its name.
+
+    Built from the cache or a single projected query, never a full model.
+    """
+
+    __slots__ = IDENTITY_FIELDS
+
+    def __init__(self, user_id, username, fname, lname, activated_at=None):
+        self.user_id = user_id
+        self.username = username
+        self.fname = fname
+        self.lname = lname
+        self.activated_at = activated_at
+
+    @property
+    def id(self):
+        return self.user_id
+
+    def to_dict(self) -> dict:
+        data = {field: getattr(self, field) for field in IDENTITY_FIELDS}
+        if isinstance(data["activated_at"], datetime):
+            data["activated_at"] = data["activated_at"].isoformat()
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "UserIdentity":
+        return cls(**{field: data.get(field) for field in IDENTITY_FIELDS})
+
+    def __str__(self):
+        return f"<UserIdentity {self.username}>"
+
+
+class IdentityCache:
+    """
+    Versioned cache of `UserIdentity` records.
+
+    Each user has a version counter (`identity:<id>:ver`) that is bumped
+    whenever the User row is saved or deleted through Tortoise. Cached records
+    carry the version they were built at and are ignored once it moves on, so
+    a change is visible on the very next request without deleting anything.
+
+    An optional local tier keeps identities in process memory for a short
+    TTL. Bumps from this worker evict it immediately; bumps from other
+    workers are picked up when the local entry expires.
+    """
+
+    def __init__(self, ttl: int = 3600):
+        self.ttl = ttl
+        self.redis = None
+        self.local_cache: LocalCache | None = None
+
+    def bind(self, redis, local_cache: LocalCache | None = None) -> None:
+        """Attach the Redis adapter (and optional local tier). Called from the lifespan."""
+        self.redis = redis
+        self.local_cache = local_cache
+
+    def _keys(self, user_id) -> tuple[str, str]:
+        return self.version_key(user_id), self.redis.key("identity", user_id)
+
+    def version_key(self, user_id) -> str:
+        """Key of the user's version counter, for callers that validate against it."""
+        return self.redis.key("identity", user_id, "ver")
+
+    async def _load(self, user_id) -> UserIdentity | None:
+        row = await User.filter(user_id=user_id).first().values(*IDENTITY_FIELDS)
+        return UserIdentity.from_dict(row) if row else None
+
+    async def get(self, user_id) -> UserIdentity | None:
+        """Return the identity for a user id, or None if the user does not exist."""
+        user_id = int(user_id)
+        if self.local_cache is not None:
+            identity = self.local_cache.get(user_id)
+            if identity is not None:
+                return identity
+
+        if self.redis is None:
+            return await self._load(user_id)
+
+        ver_key, data_key = self._keys(user_id)
+        try:
+            version, raw = await self.redis.mget([ver_key, data_key])
+        except Exception as e:
+            logger.warning("Identity cache unavailable, reading user %s from the database: %s", user_id, e)
+            return await self._load(user_id)
+
+        version = int(version or 0)
+        if raw:
+            payload = json.loads(raw)
+            if payload["v"] == version:
+                identity = UserIdentity.from_dict(payload["identity"])
+                if self.local_cache is not None:
+                    self.local_cache.set(user_id, identity)
+                return identity
+
+        identity = await self._load(user_id)
+        if identity is None:
+            return None
+        # Stored under the version read *before* the query: a bump that races
+        # with it makes this entry stale instead of silently current.
+        payload = json.dumps({"v": version, "identity": identity.to_dict()})
+        await self.redis.set(data_key, payload, ex=self.ttl)
+        if self.local_cache is not None:
+            self.local_cache.set(user_id, identity)
+        return identity
+
+    async def bump(self, user_id) -> None:
+        """Invalidate a user's cached identity by moving its version forward."""
+        user_id = int(user_id)
+        if self.local_cache is not None:
+            self.local_cache.delete(user_id)
+        if self.redis is not None:
+            ver_key, _ = self._keys(user_id)
+            await self.redis.incr(ver_key)
+
+
+identity_cache = IdentityCache()
+
+
+@post_save(User)
+async def _user_saved(sender, instance, created, using_db, update_fields) -> None:
+    await identity_cache.bump(instance.user_id)
+
+
+@post_delete(User)
+async def _user_deleted(sender, instance, using_db) -> None:
+    await identity_cache.bump(instance.user_id)
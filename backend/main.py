@@ -1,25 +1,37 @@
 # Python native
+import asyncio
+import logging
 import os
 # Dependency library
-from fastapi import FastAPI, Depends
+from fastapi import FastAPI, Depends, HTTPException, Query
 from starlette.requests import Request
-from starlette.responses import HTMLResponse, JSONResponse
-from fastapi.templating import Jinja2Templates
+from starlette.responses import HTMLResponse, PlainTextResponse
 from fastapi.staticfiles import StaticFiles
 from starlette.middleware.cors import CORSMiddleware
 ##from passlib.hash import bcrypt
 # Application Code
+from backend import config
 from backend.config import app
+from backend.templating import templates
+from backend.responses import JSONResponse
+from backend.compression import CompressionMiddleware
+from backend.metrics import MetricsMiddleware, route_metrics
 from backend.session import Session, CSRFToken
 from backend.lifespan import lifespan
 from backend.app.models import User, Game
 from backend.app.router import (auth, protected)
-from backend.dependencies import get_current_user
+from backend.dependencies import get_current_user, get_db, require_internal_token
+from backend.pagination import keyset_page, iter_keyset, stream_rows
+from backend.postgres.pool import pool_stats
+from backend.postgres.postgres import PostgresAdapter
+from backend.search import search_cache
+from backend.conditional import Validator, keyset_page_state, make_etag, table_state
+
+logger = logging.getLogger(__name__)
 
 app.include_router(auth.router)
 app.include_router(protected.router)
 
-templates = Jinja2Templates(directory="backend/public/html")
 
 origins = [
     "http://localhost:8000",
@@ -31,6 +43,32 @@ app.add_middleware(
      allow_methods=["*"],  
      allow_headers=["*"],  
 )
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=config.COMPRESSION_MIN_SIZE,
+    gzip_level=config.COMPRESSION_GZIP_LEVEL,
+    brotli_quality=config.COMPRESSION_BROTLI_QUALITY,
+)
+# Outermost, so request timing includes compression and the other middleware
+route_metrics.n_plus_one_threshold = config.METRICS_N_PLUS_ONE_THRESHOLD
+app.add_middleware(MetricsMiddleware)
+
+async def collection_validator(request, queryset, pk, after, limit, stream) -> Validator | None:
+    # A streamed export covers the whole table; a page only its own key range
+    try:
+        if stream:
+            state = await table_state(queryset, pk)
+        else:
+            state = await keyset_page_state(queryset, pk, after, limit)
+    except Exception as e:
+        # Validators only save bandwidth; serve the full response without them
+        logger.warning("Could not compute validators for %s: %s", request.url.path, e)
+        return None
+    etag = make_etag(request.url.path, request.url.query, *state.values())
+    return Validator(request, etag, state["last"])
+
+def with_validator(validator: Validator | None, response):
+    return validator.apply(response) if validator is not None else response
 
 @app.get("/")
 async def read_root(request: Request):
@@ -49,19 +87,81 @@ async def read_dashboard(request: Request):
     return templates.TemplateResponse("dashboard.html", {"request": request})
 
 @app.get("/user")
-async def get_users(request: Request):
-    users = await User.all()
+async def get_users(
+    request: Request,
+    limit: int = Query(config.PAGE_SIZE_DEFAULT, ge=1, le=config.PAGE_SIZE_MAX),
+    after: int | None = Query(None),
+    stream: str | None = Query(None, pattern="^(json|ndjson)$"),
+):
+    fields = ("username",)
+    validator = await collection_validator(request, User.all(), "user_id", after, limit, stream)
+    if validator is not None and validator.not_modified():
+        return validator.not_modified_response()
+    if stream:
+        chunks = iter_keyset(User.all(), "user_id", fields, after)
+        return with_validator(validator, stream_rows(chunks, "users", stream))
 
-    users_response = []
-    for user in users: 
-        users_response.append({"username": user.username})
-    return JSONResponse({"users": users_response})
+    users, next_cursor = await keyset_page(User.all(), "user_id", fields, after, limit)
+    return with_validator(validator, JSONResponse({"users": users, "next": next_cursor}))
 
 @app.get("/games")
-async def get_games(request: Request):
-    games = await Game.all()
+async def get_games(
+    request: Request,
+    limit: int = Query(config.PAGE_SIZE_DEFAULT, ge=1, le=config.PAGE_SIZE_MAX),
+    after: int | None = Query(None),
+    stream: str | None = Query(None, pattern="^(json|ndjson)$"),
+):
+    fields = ("gameTitle",)
+    validator = await collection_validator(request, Game.all(), "game_id", after, limit, stream)
+    if validator is not None and validator.not_modified():
+        return validator.not_modified_response()
+    if stream:
+        chunks = iter_keyset(Game.all(), "game_id", fields, after)
+        return with_validator(validator, stream_rows(chunks, "games", stream))
+
+    games, next_cursor = await keyset_page(Game.all(), "game_id", fields, after, limit)
+    return with_validator(validator, JSONResponse({"games": games, "next": next_cursor}))
+
+@app.get("/games/search")
+async def search_games(
+    q: str = Query(..., min_length=2, max_length=100),
+    limit: int = Query(config.PAGE_SIZE_DEFAULT, ge=1, le=config.PAGE_SIZE_MAX),
+    after: str | None = Query(None),
+    db: PostgresAdapter = Depends(get_db),
+):
+    try:
+        result = await search_cache.search(db, q, limit, after)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return JSONResponse(result)
+
+@app.get("/health")
+async def liveness():
+    # Liveness: the worker's event loop is running. Never touches dependencies.
+    return {"status": "ok"}
+
+@app.get("/ready")
+async def readiness(request: Request):
+    # Readiness: warm-up finished and Redis/Postgres answer
+    state = request.app.state
+    checks = {"warm_up": getattr(state, "ready", False)}
+    try:
+        checks["redis"] = await asyncio.wait_for(state.kv_store.ping(), timeout=1)
+    except Exception:
+        checks["redis"] = False
+    try:
+        checks["database"] = bool(await asyncio.wait_for(state.db.fetch("SELECT 1"), timeout=1))
+    except Exception:
+        checks["database"] = False
+    status = 200 if all(checks.values()) else 503
+    return JSONResponse({"ready": status == 200, "checks": checks}, status_code=status)
+
+@app.get("/metrics", dependencies=[Depends(require_internal_token)])
+async def get_metrics():
+    # Prometheus text exposition format; per worker, so scrape each one
+    # (with bearer_token set to INTERNAL_TOKEN in the scrape config)
+    return PlainTextResponse(route_metrics.render(), media_type="text/plain; version=0.0.4")
 
-    games_response = []
-    for game in games:
-        games_response.append({"gameTitle" : game.title})
-    return JSONResponse({"games": games_response})
+@app.get("/internal/pools", dependencies=[Depends(require_internal_token)])
+async def get_pool_stats():
+    return JSONResponse({"pools": pool_stats()})
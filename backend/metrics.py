@@ -0,0 +1,381 @@
+# Python
+import bisect
+import logging
+import time
+from collections import Counter
+from contextvars import ContextVar
+from functools import wraps
+from typing import Any, Callable
+# Libraries
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+# Application Code
+from backend import querylog
+from backend.postgres.pool import registry as pools
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds in seconds / queries; a final +Inf slot is added to each histogram
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+# Requests that matched no route share one label, so 404 scans cannot blow up cardinality
+UNMATCHED_ROUTE = "<unmatched>"
+
+TORTOISE_METHODS = ("execute_query", "execute_query_dict", "execute_insert", "execute_many", "execute_script")
+POSTGRES_METHODS = (
+    "inject", "insert", "bulk_insert", "all", "tables", "update", "update_many",
+    "exec", "fetch", "attrs", "find_by",
+)
+
+
+class Histogram:
+    """Fixed buckets with preallocated counts; `observe` is one bisect and three additions."""
+
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> list[tuple[str, int]]:
+        """(le, count of observations <= le) pairs, ending with +Inf, as Prometheus expects."""
+        total = 0
+        buckets = []
+        for bound, count in zip(self.bounds + (float("inf"),), self.counts):
+            total += count
+            buckets.append(("+Inf" if bound == float("inf") else repr(bound), total))
+        return buckets
+
+
+class RequestStats:
+    """What one request spent in the database and Redis, collected through `current`."""
+
+    __slots__ = (
+        "scope", "db_queries", "db_seconds", "statements", "raw_queries", "pg_calls", "pg_seconds",
+        "redis_commands", "redis_seconds", "slow_queries", "over_budget",
+    )
+
+    def __init__(self, scope: Scope):
+        self.scope = scope
+        self.db_queries = 0
+        self.db_seconds = 0.0
+        # Keyed by redacted SQL: Tortoise inlines literals, so a per-row lookup
+        # differs only in the id it selects
+        self.statements: Counter[str] = Counter()
+        # Statements run by PostgresAdapter.exec/fetch/find_by/iter_query (see querylog)
+        self.raw_queries = 0
+        self.pg_calls = 0
+        self.pg_seconds = 0.0
+        self.redis_commands = 0
+        self.redis_seconds = 0.0
+        self.slow_queries = 0
+        self.over_budget = False
+
+    @property
+    def route(self) -> str:
+        # The router stores the matched route in the scope
+        return getattr(self.scope.get("route"), "path", None) or UNMATCHED_ROUTE
+
+
+# The request being served by this task (and the tasks it spawns); None outside requests
+current: ContextVar[RequestStats | None] = ContextVar("request_stats", default=None)
+
+
+class RouteStats:
+    def __init__(self):
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.queries = Histogram(QUERY_COUNT_BUCKETS)
+        self.statuses: dict[int, int] = {}
+        self.db_seconds = 0.0
+        self.pg_calls = 0
+        self.pg_seconds = 0.0
+        self.redis_commands = 0
+        self.redis_seconds = 0.0
+        self.n_plus_one = 0
+        self.slow_queries = 0
+        self.over_budget = 0
+
+
+class RouteMetrics:
+    """
+    Per-route latency, status and dependency totals for this worker.
+
+    Only ever updated from the event loop, so no locking. Routes are keyed by
+    method and path template (e.g. GET /games/search), not the raw URL.
+    """
+
+    def __init__(self, n_plus_one_threshold: int = 5):
+        self.routes: dict[tuple[str, str], RouteStats] = {}
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self._flagged: set[tuple[str, str, str]] = set()
+
+    def observe(self, method: str, route: str, status: int, seconds: float, stats: RequestStats) -> None:
+        key = (method, route)
+        entry = self.routes.get(key)
+        if entry is None:
+            entry = self.routes[key] = RouteStats()
+        entry.latency.observe(seconds)
+        entry.statuses[status] = entry.statuses.get(status, 0) + 1
+        entry.queries.observe(stats.db_queries)
+        entry.db_seconds += stats.db_seconds
+        entry.pg_calls += stats.pg_calls
+        entry.pg_seconds += stats.pg_seconds
+        entry.redis_commands += stats.redis_commands
+        entry.redis_seconds += stats.redis_seconds
+        entry.slow_queries += stats.slow_queries
+        entry.over_budget += stats.over_budget
+
+        threshold = self.n_plus_one_threshold
+        if threshold and stats.db_queries >= threshold:
+            sql, repeats = stats.statements.most_common(1)[0]
+            if repeats >= threshold:
+                # The same statement once per row, e.g. a lazily loaded Game.owner in a loop
+                entry.n_plus_one += 1
+                if (method, route, sql) not in self._flagged:
+                    self._flagged.add((method, route, sql))
+                    logger.warning("Possible N+1 on %s %s: %d runs of %s", method, route, repeats, sql)
+
+    def render(self) -> str:
+        """Every metric in the Prometheus text exposition format."""
+        lines: list[str] = []
+
+        def family(name: str, kind: str, help_text: str) -> None:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        def histogram(name: str, labels: str, hist: Histogram) -> None:
+            for le, count in hist.cumulative():
+                lines.append(f'{name}_bucket{{{labels},le="{le}"}} {count}')
+            lines.append(f"{name}_sum{{{labels}}} {hist.sum!r}")
+            lines.append(f"{name}_count{{{labels}}} {hist.count}")
+
+        routes = [(_labels(method=method, route=route), entry) for (method, route), entry in self.routes.items()]
+
+        family("http_requests_total", "counter", "Requests by route and status code.")
+        for labels, entry in routes:
+            for status, count in sorted(entry.statuses.items()):
+                lines.append(f'http_requests_total{{{labels},status="{status}"}} {count}')
+        family("http_request_duration_seconds", "histogram", "Time to the last response byte.")
+        for labels, entry in routes:
+            histogram("http_request_duration_seconds", labels, entry.latency)
+        family("db_queries_per_request", "histogram", "Tortoise ORM queries run by one request.")
+        for labels, entry in routes:
+            histogram("db_queries_per_request", labels, entry.queries)
+
+        totals = (
+            ("db_query_seconds_total", "Time spent in Tortoise ORM queries.", "db_seconds"),
+            ("postgres_calls_total", "PostgresAdapter calls.", "pg_calls"),
+            ("postgres_call_seconds_total", "Time spent in PostgresAdapter calls.", "pg_seconds"),
+            ("redis_commands_total", "Redis commands sent, pipelined ones included.", "redis_commands"),
+            ("redis_seconds_total", "Time spent waiting on Redis.", "redis_seconds"),
+            ("n_plus_one_requests_total", "Requests that repeated one SQL statement at least "
+                                          f"{self.n_plus_one_threshold} times.", "n_plus_one"),
+            ("slow_queries_total", "Statements slower than the slow-query threshold.", "slow_queries"),
+            ("query_budget_exceeded_total", "Requests that ran more queries than their route's budget.",
+             "over_budget"),
+        )
+        for name, help_text, attr in totals:
+            family(name, "counter", help_text)
+            for labels, entry in routes:
+                lines.append(f"{name}{{{labels}}} {getattr(entry, attr)!r}")
+
+        snapshots = [(pool.snapshot(), pool.metrics) for pool in pools.values()]
+        family("db_pool_connections", "gauge", "Open pool connections by state.")
+        for snapshot, _ in snapshots:
+            for state in ("in_use", "idle"):
+                lines.append(f'db_pool_connections{{pool="{snapshot["pool"]}",state="{state}"}} {snapshot[state]}')
+        family("db_pool_max_size", "gauge", "Pool size limit.")
+        for snapshot, _ in snapshots:
+            lines.append(f'db_pool_max_size{{pool="{snapshot["pool"]}"}} {snapshot["max_size"]}')
+        family("db_pool_acquires_total", "counter", "Connections handed out.")
+        for snapshot, pool_metrics in snapshots:
+            lines.append(f'db_pool_acquires_total{{pool="{snapshot["pool"]}"}} {pool_metrics.acquires}')
+        family("db_pool_acquire_timeouts_total", "counter", "Acquires that timed out.")
+        for snapshot, pool_metrics in snapshots:
+            lines.append(f'db_pool_acquire_timeouts_total{{pool="{snapshot["pool"]}"}} {pool_metrics.timeouts}')
+        family("db_pool_acquire_wait_seconds_total", "counter", "Time spent waiting for a connection.")
+        for snapshot, pool_metrics in snapshots:
+            lines.append(
+                f'db_pool_acquire_wait_seconds_total{{pool="{snapshot["pool"]}"}} {pool_metrics.wait_seconds_total!r}'
+            )
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels: str) -> str:
+    return ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items())
+
+
+route_metrics = RouteMetrics()
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware that records every HTTP request into `route_metrics`.
+
+    Installs a fresh `RequestStats` in `current` for the request, so the
+    instrumented Tortoise, PostgresAdapter and Redis calls made while serving
+    it are attributed to its route. Add it last so it wraps the other
+    middleware and the timing covers the whole response.
+    """
+
+    def __init__(self, app: ASGIApp, registry: RouteMetrics = route_metrics):
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        stats = RequestStats(scope)
+        token = current.set(stats)
+        status = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            seconds = time.perf_counter() - start
+            current.reset(token)
+            self.registry.observe(scope["method"], stats.route, status, seconds, stats)
+
+
+def _timed(func: Callable, inside: ContextVar, record: Callable[[RequestStats, float, tuple, Any], None]) -> Callable:
+    # `inside` keeps nested instrumented calls (e.g. execute_query_dict calling
+    # execute_query) from being counted twice
+    @wraps(func)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        stats = current.get()
+        if stats is None or inside.get():
+            return await func(*args, **kwargs)
+        token = inside.set(True)
+        start = time.perf_counter()
+        try:
+            result = await func(*args, **kwargs)
+        except BaseException:
+            record(stats, time.perf_counter() - start, args, None)
+            raise
+        finally:
+            inside.reset(token)
+        # Outside the try: a query budget overrun raised here must not look like a query failure
+        record(stats, time.perf_counter() - start, args, result)
+        return result
+
+    wrapper._metrics_timed = True
+    return wrapper
+
+
+_in_db = ContextVar("metrics_in_db", default=False)
+_in_postgres = ContextVar("metrics_in_postgres", default=False)
+_in_redis = ContextVar("metrics_in_redis", default=False)
+# Called as on_query(client, sql, params, seconds, result) after each timed ORM statement
+_on_query: Callable[[Any, str, Any, float, Any], None] | None = None
+
+
+def _record_db(stats: RequestStats, seconds: float, args: tuple, result: Any) -> None:
+    stats.db_queries += 1
+    stats.db_seconds += seconds
+    # args[0] is the client, args[1] the SQL, args[2] (if given) its parameters
+    if len(args) > 1 and isinstance(args[1], str):
+        stats.statements[querylog.redact(args[1])] += 1
+        if _on_query is not None:
+            _on_query(args[0], args[1], args[2] if len(args) > 2 else None, seconds, result)
+
+
+def _record_postgres(stats: RequestStats, seconds: float, args: tuple, result: Any) -> None:
+    stats.pg_calls += 1
+    stats.pg_seconds += seconds
+
+
+def _record_redis(stats: RequestStats, seconds: float, args: tuple, result: Any) -> None:
+    stats.redis_commands += 1
+    stats.redis_seconds += seconds
+
+
+def instrument_tortoise(connection_name: str = "default", on_query: Callable | None = None) -> None:
+    """
+    Times and counts the queries of a Tortoise connection, transactions included.
+
+    The execute_* methods are wrapped on the client class and on its
+    transaction class, since `in_transaction()` runs queries on a separate
+    client object.
+
+    Args:
+        connection_name (str): Tortoise connection to instrument.
+        on_query (Callable | None): Called with (client, sql, params, seconds, result)
+            after every statement run during a request, e.g. `query_log.observe_orm`.
+    """
+    global _on_query
+    from tortoise import connections
+
+    if on_query is not None:
+        _on_query = on_query
+
+    client = connections.get(connection_name)
+    classes = type(client).__mro__ + getattr(client, "_transaction_class", object).__mro__
+    for cls in dict.fromkeys(classes):
+        if cls is object:
+            continue
+        for name in TORTOISE_METHODS:
+            func = cls.__dict__.get(name)
+            if func is not None and not getattr(func, "_metrics_timed", False):
+                setattr(cls, name, _timed(func, _in_db, _record_db))
+
+
+def instrument_postgres(adapter: Any) -> None:
+    """Times and counts the query methods of one PostgresAdapter (or stand-in) instance."""
+    for name in POSTGRES_METHODS:
+        method = getattr(adapter, name, None)
+        if method is not None and not getattr(method, "_metrics_timed", False):
+            setattr(adapter, name, _timed(method, _in_postgres, _record_postgres))
+
+
+def instrument_redis(adapter: Any) -> None:
+    """
+    Times and counts the commands a RedisAdapter's connection sends.
+
+    Single commands (scripts and coalesced MGETs included) go through
+    `execute_command`; a pipeline is timed as one round trip and counted
+    as the commands it carried.
+    """
+    conn = adapter.conn
+    if getattr(conn.execute_command, "_metrics_timed", False):
+        return
+    conn.execute_command = _timed(conn.execute_command, _in_redis, _record_redis)
+    make_pipeline = conn.pipeline
+
+    def pipeline(*args: Any, **kwargs: Any):
+        pipe = make_pipeline(*args, **kwargs)
+        execute = pipe.execute
+
+        async def timed_execute(*args: Any, **kwargs: Any) -> Any:
+            stats = current.get()
+            if stats is None:
+                return await execute(*args, **kwargs)
+            commands = len(pipe)
+            start = time.perf_counter()
+            try:
+                return await execute(*args, **kwargs)
+            finally:
+                stats.redis_commands += commands
+                stats.redis_seconds += time.perf_counter() - start
+
+        pipe.execute = timed_execute
+        return pipe
+
+    conn.pipeline = pipeline
@@ -0,0 +1,267 @@
+"""
+Versioned schema migrations.
+
+Migrations are plain SQL files in backend/migrations named
+`<version>_<name>.sql` and applied in version order. Applied versions are
+recorded in `schema_migrations`. The runner holds a Postgres advisory lock
+while it works, so when every worker boots with DB_MIGRATE_ON_STARTUP=apply
+only one of them changes the schema and the rest wait, then find nothing to do.
+
+A file whose first line is `-- migrate: no-transaction` runs statement by
+statement outside a transaction (needed for CREATE INDEX CONCURRENTLY).
+Other files run in a single transaction. A CONCURRENTLY build that fails
+leaves an INVALID index behind, which `IF NOT EXISTS` would then skip for
+good; such leftovers are dropped before their CREATE INDEX is retried.
+
+Index migrations are generated from model Meta (`indexes` and the custom
+`expression_indexes`, `unique_expression_indexes` and `trigram_indexes`):
+
+    python -m backend.migrate status
+    python -m backend.migrate apply
+    python -m backend.migrate make add_game_indexes
+"""
+# Python
+import argparse
+import asyncio
+import logging
+import re
+from pathlib import Path
+# Libraries
+import asyncpg
+# Application Code
+from backend import config
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_DIR = Path(__file__).parent / "migrations"
+NO_TRANSACTION = "-- migrate: no-transaction"
+# Arbitrary, but fixed: every worker must contend for the same lock
+ADVISORY_LOCK_KEY = 7_203_114_715
+
+_FILENAME = re.compile(r"^(\d+)_(\w+)\.sql$")
+# The index name of a `CREATE [UNIQUE] INDEX CONCURRENTLY IF NOT EXISTS <name>` statement, as written
+_CONCURRENT_INDEX = re.compile(
+    r'^CREATE\s+(?:UNIQUE\s+)?INDEX\s+CONCURRENTLY\s+IF\s+NOT\s+EXISTS\s+("(?:[^"]|"")+"|\w+)', re.I
+)
+
+
+class Migration:
+    """One migration file."""
+
+    def __init__(self, version: int, name: str, path: Path):
+        self.version = version
+        self.name = name
+        self.path = path
+
+    @property
+    def sql(self) -> str:
+        return self.path.read_text()
+
+    @property
+    def transactional(self) -> bool:
+        return not self.sql.lstrip().startswith(NO_TRANSACTION)
+
+    def statements(self) -> list[str]:
+        """The file split into single statements (one per `;` ending a line)."""
+        lines = [line for line in self.sql.splitlines() if not line.lstrip().startswith("--")]
+        return [stmt.strip() for stmt in re.split(r";\s*$", "\n".join(lines), flags=re.M) if stmt.strip()]
+
+    def __repr__(self):
+        return f"<Migration {self.version:04d}_{self.name}>"
+
+
+def discover(directory: Path = MIGRATIONS_DIR) -> list[Migration]:
+    """Every migration file in directory, sorted by version."""
+    migrations = []
+    for path in directory.glob("*.sql"):
+        match = _FILENAME.match(path.name)
+        if match:
+            migrations.append(Migration(int(match[1]), match[2], path))
+    migrations.sort(key=lambda m: m.version)
+    versions = [m.version for m in migrations]
+    if len(versions) != len(set(versions)):
+        raise ValueError(f"Duplicate migration versions in {directory}")
+    return migrations
+
+
+async def _ensure_table(conn) -> None:
+    await conn.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INT PRIMARY KEY,
+            name TEXT NOT NULL,
+            applied_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+
+async def _applied(conn) -> set[int]:
+    exists = await conn.fetchval("SELECT to_regclass('schema_migrations') IS NOT NULL")
+    if not exists:
+        return set()
+    return {row["version"] for row in await conn.fetch("SELECT version FROM schema_migrations")}
+
+
+async def pending(dsn: str | None = None) -> list[Migration]:
+    """Migrations not yet applied. Read-only; does not take the lock."""
+    conn = await asyncpg.connect(dsn or config.DATABASE_URL)
+    try:
+        applied = await _applied(conn)
+    finally:
+        await conn.close()
+    return [m for m in discover() if m.version not in applied]
+
+
+async def apply(dsn: str | None = None) -> list[Migration]:
+    """
+    Applies every pending migration under the advisory lock.
+
+    Args:
+        dsn (str): Database URL. Defaults to DATABASE_URL.
+
+    Returns:
+        list: The migrations applied by this call.
+    """
+    conn = await asyncpg.connect(dsn or config.DATABASE_URL)
+    done = []
+    try:
+        # Session-level lock on a dedicated connection; blocks until other workers finish
+        await conn.execute("SELECT pg_advisory_lock($1)", ADVISORY_LOCK_KEY)
+        try:
+            await _ensure_table(conn)
+            applied = await _applied(conn)
+            for migration in discover():
+                if migration.version in applied:
+                    continue
+                if migration.transactional:
+                    async with conn.transaction():
+                        await conn.execute(migration.sql)
+                        await _record(conn, migration)
+                else:
+                    for statement in migration.statements():
+                        await _drop_invalid_index(conn, statement)
+                        await conn.execute(statement)
+                    await _record(conn, migration)
+                done.append(migration)
+        finally:
+            await conn.execute("SELECT pg_advisory_unlock($1)", ADVISORY_LOCK_KEY)
+    finally:
+        await conn.close()
+    return done
+
+
+def concurrent_index_name(statement: str) -> str | None:
+    """The (possibly quoted) index name a CREATE INDEX CONCURRENTLY IF NOT EXISTS builds, else None."""
+    match = _CONCURRENT_INDEX.match(statement)
+    return match[1] if match else None
+
+
+async def _drop_invalid_index(conn, statement: str) -> None:
+    # A failed CONCURRENTLY build leaves an INVALID index that IF NOT EXISTS would keep
+    name = concurrent_index_name(statement)
+    if name is None:
+        return
+    valid = await conn.fetchval(
+        "SELECT indisvalid FROM pg_index WHERE indexrelid = to_regclass($1)", name
+    )
+    if valid is False:
+        logger.warning("Dropping invalid index %s left by an earlier failed build", name)
+        await conn.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+
+
+async def _record(conn, migration: Migration) -> None:
+    await conn.execute(
+        "INSERT INTO schema_migrations (version, name) VALUES ($1, $2)",
+        migration.version, migration.name,
+    )
+
+
+def _index_name(table: str, parts: list[str], prefix: str = "idx") -> str:
+    name = "_".join(re.sub(r"\W+", "_", part).strip("_") for part in parts)
+    return f"{prefix}_{table}_{name}"[:63]
+
+
+def declared_indexes(models=None) -> dict[str, str]:
+    """
+    CREATE INDEX statements for the indexes declared in model Meta, by index name.
+
+    `indexes` lists field names (as Tortoise does); `expression_indexes`
+    lists SQL expressions over column names, e.g. "lower(email)", and
+    `unique_expression_indexes` the same for UNIQUE indexes;
+    `trigram_indexes` lists fields that get a pg_trgm GIN index for fuzzy search.
+    """
+    if models is None:
+        from backend.app.models import Game, User
+        models = (User, Game)
+    statements = {}
+    for model in models:
+        meta = model._meta
+        table = meta.db_table
+        for fields in meta.indexes:
+            columns = [meta.fields_db_projection.get(field, field) for field in fields]
+            name = _index_name(table, columns)
+            cols = ", ".join(f'"{column}"' for column in columns)
+            statements[name] = f'CREATE INDEX CONCURRENTLY IF NOT EXISTS "{name}" ON "{table}" ({cols});'
+        for expression in getattr(model.Meta, "expression_indexes", ()):
+            name = _index_name(table, [expression])
+            statements[name] = f'CREATE INDEX CONCURRENTLY IF NOT EXISTS "{name}" ON "{table}" ({expression});'
+        for expression in getattr(model.Meta, "unique_expression_indexes", ()):
+            name = _index_name(table, [expression], prefix="uniq")
+            statements[name] = (
+                f'CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS "{name}" ON "{table}" ({expression});'
+            )
+        for field in getattr(model.Meta, "trigram_indexes", ()):
+            column = meta.fields_db_projection.get(field, field)
+            name = _index_name(table, [column, "trgm"])
+            statements[name] = (
+                f'CREATE INDEX CONCURRENTLY IF NOT EXISTS "{name}" ON "{table}" USING gin ("{column}" gin_trgm_ops);'
+            )
+    return statements
+
+
+def make(name: str, directory: Path = MIGRATIONS_DIR) -> Path | None:
+    """
+    Writes a migration for declared indexes that no existing migration mentions.
+
+    Returns:
+        Path | None: The new file, or None if there was nothing to add.
+    """
+    existing = discover(directory)
+    known = "\n".join(m.sql for m in existing)
+    missing = [sql for index, sql in declared_indexes().items() if f'"{index}"' not in known]
+    if not missing:
+        return None
+    if any("gin_trgm_ops" in sql for sql in missing):
+        missing.insert(0, "CREATE EXTENSION IF NOT EXISTS pg_trgm;")
+    version = (existing[-1].version if existing else 0) + 1
+    slug = re.sub(r"\W+", "_", name)
+    path = directory / f"{version:04d}_{slug}.sql"
+    path.write_text(f"{NO_TRANSACTION}\n" + "\n".join(missing) + "\n")
+    return path
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Schema migrations")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("status", help="list pending migrations")
+    commands.add_parser("apply", help="apply pending migrations")
+    make_cmd = commands.add_parser("make", help="generate an index migration from model Meta")
+    make_cmd.add_argument("name")
+    args = parser.parse_args()
+
+    if args.command == "make":
+        from tortoise import Tortoise
+        # Resolves field metadata without a database connection
+        Tortoise.init_models(["backend.app.models"], "models")
+        path = make(args.name)
+        print(f"Created {path}" if path else "No new indexes declared")
+    elif args.command == "status":
+        waiting = await pending()
+        print("\n".join(f"pending {m.version:04d}_{m.name}" for m in waiting) or "Schema is up to date")
+    else:
+        applied = await apply()
+        print("\n".join(f"applied {m.version:04d}_{m.name}" for m in applied) or "Nothing to apply")
+
+
+# Run the async entrypoint
+if __name__ == "__main__":
+    asyncio.run(main())
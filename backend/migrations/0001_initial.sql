@@ -0,0 +1,25 @@
+-- Baseline schema, matching what Tortoise.generate_schemas() created before
+-- migrations existed (IF NOT EXISTS so existing databases adopt it as-is).
+CREATE TABLE IF NOT EXISTS "users" (
+    "user_id" SERIAL NOT NULL PRIMARY KEY,
+    "username" VARCHAR(50) NOT NULL UNIQUE,
+    "email" VARCHAR(255) NOT NULL UNIQUE,
+    "digest" VARCHAR(128) NOT NULL,
+    "fname" VARCHAR(50) NOT NULL,
+    "lname" VARCHAR(50) NOT NULL,
+    "activated_at" TIMESTAMPTZ NOT NULL,
+    "created_at" TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    "updated_at" TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS "games" (
+    "game_id" SERIAL NOT NULL PRIMARY KEY,
+    "gameTitle" VARCHAR(50) NOT NULL UNIQUE,
+    "category" VARCHAR(50) NOT NULL,
+    "platform" VARCHAR(50) NOT NULL,
+    "status" VARCHAR(50) NOT NULL,
+    "rating" INT,
+    "owner_id" INT NOT NULL REFERENCES "users" ("user_id") ON DELETE CASCADE,
+    "created_at" TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    "updated_at" TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
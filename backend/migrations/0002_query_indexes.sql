@@ -0,0 +1,4 @@
+-- migrate: no-transaction
+CREATE INDEX CONCURRENTLY IF NOT EXISTS "idx_users_lower_email" ON "users" (lower(email));
+CREATE INDEX CONCURRENTLY IF NOT EXISTS "idx_games_owner_id_status" ON "games" ("owner_id", "status");
+CREATE INDEX CONCURRENTLY IF NOT EXISTS "idx_games_owner_id_created_at" ON "games" ("owner_id", "created_at");
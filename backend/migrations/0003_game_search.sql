@@ -0,0 +1,5 @@
+-- migrate: no-transaction
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE INDEX CONCURRENTLY IF NOT EXISTS "idx_games_gameTitle_trgm" ON "games" USING gin ("gameTitle" gin_trgm_ops);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS "idx_games_category_trgm" ON "games" USING gin ("category" gin_trgm_ops);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS "idx_games_platform_trgm" ON "games" USING gin ("platform" gin_trgm_ops);
@@ -0,0 +1,7 @@
+-- migrate: no-transaction
+-- Emails are unique ignoring case. Fails while two accounts differ only in
+-- email case; find them with
+--   SELECT lower(email), array_agg(user_id) FROM users GROUP BY 1 HAVING count(*) > 1;
+-- and merge or rename them first.
+CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS "uniq_users_lower_email" ON "users" (lower(email));
+DROP INDEX CONCURRENTLY IF EXISTS "idx_users_lower_email";
@@ -0,0 +1,92 @@
+# Python
+from typing import Any, AsyncIterator
+# Libraries
+from starlette.responses import StreamingResponse
+from tortoise.queryset import QuerySet
+# Application Code
+from backend import config
+from backend.responses import dumps
+
+STREAM_MEDIA_TYPES = {
+    "json": "application/json",
+    "ndjson": "application/x-ndjson",
+}
+
+
+async def keyset_page(
+    queryset: QuerySet,
+    pk: str,
+    fields: tuple[str, ...],
+    after: Any = None,
+    limit: int = config.PAGE_SIZE_DEFAULT,
+) -> tuple[list[dict[str, Any]], Any]:
+    """
+    Fetch one page of rows ordered by primary key, starting after a cursor.
+
+    Rows are returned as plain dicts through `.values()`, so no model
+    instances are built. The primary key is always included because it is
+    the cursor for the next page.
+
+    Args:
+        queryset (QuerySet): Base queryset (may already be filtered).
+        pk (str): Primary key column used as the keyset cursor.
+        fields (tuple[str, ...]): Extra columns to project.
+        after (Any): Return rows whose pk is strictly greater than this.
+        limit (int): Maximum number of rows in the page.
+
+    Returns:
+        tuple[list[dict], Any]: The rows and the cursor of the next page,
+        or None when this was the last page.
+    """
+    if after is not None:
+        queryset = queryset.filter(**{f"{pk}__gt": after})
+    rows = await queryset.order_by(pk).limit(limit).values(pk, *fields)
+    next_cursor = rows[-1][pk] if len(rows) == limit else None
+    return rows, next_cursor
+
+
+async def iter_keyset(
+    queryset: QuerySet,
+    pk: str,
+    fields: tuple[str, ...],
+    after: Any = None,
+    chunk_size: int = config.STREAM_CHUNK_SIZE,
+) -> AsyncIterator[list[dict[str, Any]]]:
+    """
+    Walk a whole table page by page, yielding each chunk of rows.
+
+    Only one chunk is held in memory at a time.
+    """
+    while True:
+        rows, after = await keyset_page(queryset, pk, fields, after, chunk_size)
+        if rows:
+            yield rows
+        if after is None:
+            return
+
+
+async def _encode(chunks: AsyncIterator[list[dict]], key: str, fmt: str) -> AsyncIterator[bytes]:
+    if fmt == "ndjson":
+        async for rows in chunks:
+            yield b"".join(dumps(row) + b"\n" for row in rows)
+        return
+
+    yield f'{{"{key}": ['.encode()
+    first = True
+    async for rows in chunks:
+        body = b", ".join(dumps(row) for row in rows)
+        yield body if first else b", " + body
+        first = False
+    yield b"]}"
+
+
+def stream_rows(chunks: AsyncIterator[list[dict]], key: str, fmt: str = "json") -> StreamingResponse:
+    """
+    Stream chunks of rows to the client as they are fetched.
+
+    Args:
+        chunks (AsyncIterator[list[dict]]): Usually the output of `iter_keyset`.
+        key (str): Top-level key of the JSON document (ignored for ndjson).
+        fmt (str): "json" for a single JSON object, "ndjson" for one row per line.
+    """
+    return StreamingResponse(_encode(chunks, key, fmt), media_type=STREAM_MEDIA_TYPES[fmt])
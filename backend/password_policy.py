@@ -0,0 +1,150 @@
+# Python
+import logging
+import time
+from functools import lru_cache
+# Application Code
+from backend import config
+
+logger = logging.getLogger(__name__)
+
+# passlib (and the argon2/bcrypt backends it loads) is imported on first use
+# rather than at import time, keeping it off the worker startup path.
+
+
+@lru_cache(maxsize=None)
+def verify_context():
+    """
+    CryptContext of the schemes we can still verify.
+
+    Anything other than argon2 is deprecated and gets rehashed on the next
+    successful login.
+    """
+    from passlib.context import CryptContext
+    return CryptContext(schemes=["argon2", "bcrypt"], deprecated=["bcrypt"])
+
+
+def argon2_handler():
+    """passlib's argon2 handler, imported lazily."""
+    from passlib.hash import argon2
+    return argon2
+
+
+def preload() -> None:
+    """
+    Resolves the handlers and loads the argon2 backend on the calling thread.
+
+    passlib's lazy `passlib.hash` module is not safe to import from several
+    threads at once (concurrent first imports raise ImportError), so this
+    runs once before any worker thread hashes.
+    """
+    verify_context()
+    argon2_handler().get_backend()
+
+_CALIBRATION_PASSWORD = "calibration-password-0123456789"
+
+
+class HashingPolicy:
+    """
+    Holds the argon2 cost parameters new digests are produced with.
+
+    Each cost is either pinned through config or calibrated on the current
+    host so one hash takes roughly `target_ms`. Stored digests made with
+    weaker parameters (or another scheme) are reported by `needs_update` so
+    they can be upgraded transparently on login.
+    """
+
+    def __init__(
+        self,
+        target_ms: float = 75,
+        memory_cost: int = 19456,
+        min_memory_cost: int = 8192,
+        parallelism: int = 1,
+        max_time_cost: int = 10,
+        time_cost: int = 2,
+        pin_time_cost: bool = False,
+        pin_memory_cost: bool = False,
+    ):
+        self.target_ms = target_ms
+        self.memory_cost = memory_cost
+        self.min_memory_cost = min_memory_cost
+        self.parallelism = parallelism
+        self.max_time_cost = max_time_cost
+        self.time_cost = time_cost
+        self.pin_time_cost = pin_time_cost
+        self.pin_memory_cost = pin_memory_cost
+        self.calibrated = False
+
+    @property
+    def settings(self) -> dict[str, int]:
+        """argon2 settings for `argon2.using(**settings)`, picklable for process pools."""
+        return {
+            "time_cost": self.time_cost,
+            "memory_cost": self.memory_cost,
+            "parallelism": self.parallelism,
+        }
+
+    def _measure(self, time_cost: int, memory_cost: int) -> float:
+        handler = argon2_handler().using(
+            time_cost=time_cost, memory_cost=memory_cost, parallelism=self.parallelism
+        )
+        start = time.perf_counter()
+        handler.hash(_CALIBRATION_PASSWORD)
+        return (time.perf_counter() - start) * 1000
+
+    def calibrate(self) -> dict[str, int]:
+        """
+        Picks the strongest parameters whose hash time fits the latency budget.
+
+        Memory cost is halved (down to `min_memory_cost`) until a single pass
+        fits, then time cost is raised while it still fits. A pinned cost is
+        kept as is and only the other one is searched. Blocking: run it on a
+        worker thread, not the event loop, with no other hashing running.
+
+        Returns:
+            dict: The chosen settings.
+        """
+        memory_cost = self.memory_cost
+        if not self.pin_memory_cost:
+            first_pass = self.time_cost if self.pin_time_cost else 1
+            while memory_cost > self.min_memory_cost and self._measure(first_pass, memory_cost) > self.target_ms:
+                memory_cost //= 2
+            memory_cost = max(memory_cost, self.min_memory_cost)
+
+        time_cost = self.time_cost
+        if not self.pin_time_cost:
+            time_cost = 1
+            while time_cost < self.max_time_cost and self._measure(time_cost + 1, memory_cost) <= self.target_ms:
+                time_cost += 1
+
+        self.time_cost, self.memory_cost = time_cost, memory_cost
+        self.calibrated = True
+        logger.info(
+            "argon2 calibrated to time_cost=%d memory_cost=%dKiB for a %.0fms budget",
+            time_cost, memory_cost, self.target_ms,
+        )
+        return self.settings
+
+    def needs_update(self, digest: str) -> bool:
+        """
+        True if the digest uses a deprecated scheme or weaker argon2 parameters.
+
+        Stronger digests are left alone: workers calibrate independently and
+        land on slightly different costs, and a login must not bounce a digest
+        between them or downgrade it.
+        """
+        try:
+            if verify_context().identify(digest) != "argon2":
+                return True
+            stored = argon2_handler().from_string(digest)
+        except ValueError:
+            return True
+        return stored.rounds < self.time_cost or stored.memory_cost < self.memory_cost
+
+
+policy = HashingPolicy(
+    target_ms=config.PASSWORD_HASH_TARGET_MS,
+    memory_cost=config.PASSWORD_HASH_MEMORY_KIB or 19456,
+    time_cost=config.PASSWORD_HASH_TIME_COST or 2,
+    pin_time_cost=bool(config.PASSWORD_HASH_TIME_COST),
+    pin_memory_cost=bool(config.PASSWORD_HASH_MEMORY_KIB),
+)
@@ -0,0 +1,204 @@
+# Python
+import asyncio
+import time
+from typing import Any
+# Libraries
+from tortoise.backends.base.config_generator import expand_db_url
+
+
+class PoolSettings:
+    """
+    Connection pool sizing shared by the Tortoise ORM pool and the raw PostgresAdapter pool.
+
+    Attributes:
+        dsn (str): postgres:// connection URL.
+        min_size (int): Connections opened up front.
+        max_size (int): Upper bound of connections per worker.
+        max_queries (int): Queries served by a connection before it is replaced.
+        max_inactive_connection_lifetime (float): Seconds an idle connection is kept.
+        statement_cache_size (int): Prepared statements kept per connection.
+        acquire_timeout (float | None): Seconds to wait for a free connection.
+    """
+
+    def __init__(
+        self,
+        dsn: str,
+        min_size: int = 1,
+        max_size: int = 10,
+        max_queries: int = 50000,
+        max_inactive_connection_lifetime: float = 300.0,
+        statement_cache_size: int = 256,
+        acquire_timeout: float | None = 10.0,
+    ):
+        self.dsn = dsn
+        self.min_size = min(min_size, max_size)
+        self.max_size = max_size
+        self.max_queries = max_queries
+        self.max_inactive_connection_lifetime = max_inactive_connection_lifetime
+        self.statement_cache_size = statement_cache_size
+        self.acquire_timeout = acquire_timeout
+
+    @classmethod
+    def from_config(cls, role: str = "orm") -> "PoolSettings":
+        """
+        Builds the settings for the "orm" or "raw" pool.
+
+        Unless DB_POOL_MAX_SIZE / DB_RAW_POOL_MAX_SIZE are set, each worker's
+        share of DB_MAX_CONNECTIONS (divided by WEB_CONCURRENCY) is split 3:1
+        between the ORM and the raw adapter.
+        """
+        # backend.config builds the app (and so imports the lifespan and this module)
+        from backend import config
+
+        budget = max(2, config.DB_MAX_CONNECTIONS // max(1, config.WEB_CONCURRENCY))
+        orm_size = config.DB_POOL_MAX_SIZE or max(1, budget * 3 // 4)
+        raw_size = config.DB_RAW_POOL_MAX_SIZE or max(1, budget - orm_size)
+        return cls(
+            dsn=config.DATABASE_URL,
+            min_size=config.DB_POOL_MIN_SIZE,
+            max_size=orm_size if role == "orm" else raw_size,
+            max_queries=config.DB_POOL_MAX_QUERIES,
+            max_inactive_connection_lifetime=config.DB_POOL_MAX_IDLE_SECONDS,
+            statement_cache_size=config.DB_STATEMENT_CACHE_SIZE,
+            acquire_timeout=config.DB_POOL_ACQUIRE_TIMEOUT or None,
+        )
+
+    def asyncpg_kwargs(self) -> dict[str, Any]:
+        """Keyword arguments for `asyncpg.create_pool`."""
+        return {
+            "dsn": self.dsn,
+            "min_size": self.min_size,
+            "max_size": self.max_size,
+            "max_queries": self.max_queries,
+            "max_inactive_connection_lifetime": self.max_inactive_connection_lifetime,
+            "statement_cache_size": self.statement_cache_size,
+        }
+
+    def tortoise_config(self, modules: list[str]) -> dict[str, Any]:
+        """Tortoise.init(config=...) using this pool sizing."""
+        connection = expand_db_url(self.dsn)
+        if connection["engine"].endswith("asyncpg"):
+            # Passed straight through to asyncpg.create_pool by Tortoise
+            connection["credentials"].update(
+                minsize=self.min_size,
+                maxsize=self.max_size,
+                max_queries=self.max_queries,
+                max_inactive_connection_lifetime=self.max_inactive_connection_lifetime,
+                statement_cache_size=self.statement_cache_size,
+            )
+        return {
+            "connections": {"default": connection},
+            "apps": {"models": {"models": modules, "default_connection": "default"}},
+        }
+
+
+class PoolMetrics:
+    """Acquire counters for one pool. Updated from the event loop only, so no locking."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.acquires = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def record_wait(self, seconds: float) -> None:
+        self.acquires += 1
+        self.wait_seconds_total += seconds
+        if seconds > self.wait_seconds_max:
+            self.wait_seconds_max = seconds
+
+
+class _TimedAcquire:
+    # Mirrors asyncpg's PoolAcquireContext: usable with `await` and `async with`
+    def __init__(self, pool: "InstrumentedPool", timeout: float | None):
+        self.pool = pool
+        self.timeout = timeout
+        self.connection = None
+
+    async def _acquire(self):
+        metrics = self.pool.metrics
+        start = time.perf_counter()
+        try:
+            return await self.pool.pool.acquire(timeout=self.timeout)
+        except asyncio.TimeoutError:
+            metrics.timeouts += 1
+            raise
+        finally:
+            metrics.record_wait(time.perf_counter() - start)
+
+    def __await__(self):
+        return self._acquire().__await__()
+
+    async def __aenter__(self):
+        self.connection = await self._acquire()
+        return self.connection
+
+    async def __aexit__(self, *exc):
+        connection, self.connection = self.connection, None
+        await self.pool.pool.release(connection)
+
+
+class InstrumentedPool:
+    """
+    Wraps an asyncpg pool and times every acquire; everything else is passed through.
+
+    Drop-in for both PostgresAdapter and Tortoise's asyncpg client, which
+    only use acquire/release/close on their pool.
+    """
+
+    def __init__(self, pool, name: str, acquire_timeout: float | None = None):
+        self.pool = pool
+        self.acquire_timeout = acquire_timeout
+        self.metrics = PoolMetrics(name)
+        registry[name] = self
+
+    def acquire(self, *, timeout: float | None = None) -> _TimedAcquire:
+        return _TimedAcquire(self, timeout if timeout is not None else self.acquire_timeout)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.pool, name)
+
+    def snapshot(self) -> dict[str, Any]:
+        """Live pool state plus acquire statistics."""
+        size = self.pool.get_size()
+        idle = self.pool.get_idle_size()
+        metrics = self.metrics
+        return {
+            "pool": metrics.name,
+            "size": size,
+            "idle": idle,
+            "in_use": size - idle,
+            "min_size": self.pool.get_min_size(),
+            "max_size": self.pool.get_max_size(),
+            "acquires": metrics.acquires,
+            "timeouts": metrics.timeouts,
+            "acquire_wait_ms_avg": (metrics.wait_seconds_total / metrics.acquires * 1000) if metrics.acquires else 0.0,
+            "acquire_wait_ms_max": metrics.wait_seconds_max * 1000,
+        }
+
+
+registry: dict[str, InstrumentedPool] = {}
+
+
+async def instrument_tortoise(connection_name: str = "default", settings: PoolSettings | None = None) -> None:
+    """
+    Opens Tortoise's asyncpg pool (it is otherwise created lazily) and wraps it.
+
+    Non-asyncpg backends (e.g. SQLite) are left untouched.
+    """
+    from tortoise import connections
+
+    client = connections.get(connection_name)
+    if not hasattr(client, "_pool"):
+        return
+    if client._pool is None:
+        await client.create_connection(with_db=True)
+    if client._pool is not None and not isinstance(client._pool, InstrumentedPool):
+        timeout = settings.acquire_timeout if settings else None
+        client._pool = InstrumentedPool(client._pool, "orm", acquire_timeout=timeout)
+
+
+def pool_stats() -> list[dict[str, Any]]:
+    """Snapshots of every instrumented pool in this worker."""
+    return [pool.snapshot() for pool in registry.values()]
@@ -1,19 +1,123 @@
 import os
+import time
+from functools import lru_cache
+from typing import Any, AsyncIterable, AsyncIterator, Iterable
 import asyncpg
+# Application Code
+from backend.postgres.pool import InstrumentedPool, PoolSettings
+from backend import metrics
+from backend.querylog import query_log
 
-# Database connection parameters retrieved from environment variables
-db_config = {
-    "host": "",
-    "user": os.getenv("USER"),
-    "password": os.getenv("PASSWORD"),
-    "db": os.getenv("DB"),
-    "port": os.getenv("PORT"),
+STATEMENT_CACHE_SIZE = 256
+
+
+def quote_ident(name: str) -> str:
+    """
+    Quotes a (possibly schema-qualified) identifier, e.g. public.games -> "public"."games".
+
+    Needed for mixed-case columns such as "gameTitle".
+    """
+    return ".".join('"' + part.replace('"', '""') + '"' for part in name.split("."))
+
+
+# Generated SQL is cached per statement shape. Identical text also lets
+# asyncpg reuse the prepared statement it keeps per connection.
+@lru_cache(maxsize=512)
+def insert_sql(table: str, columns: tuple[str, ...]) -> str:
+    cols = ", ".join(quote_ident(col) for col in columns)
+    values = ", ".join("$" + str(i + 1) for i in range(len(columns)))  # Placeholder for parameterized query
+    return f"INSERT INTO {quote_ident(table)} ({cols}) VALUES ({values})"
+
+
+@lru_cache(maxsize=512)
+def select_all_sql(table: str) -> str:
+    return f"SELECT * FROM {quote_ident(table)}"
+
+
+@lru_cache(maxsize=512)
+def find_by_sql(table: str, attr: str) -> str:
+    return f"SELECT * FROM {quote_ident(table)} WHERE {quote_ident(attr)} = $1"
+
+
+@lru_cache(maxsize=512)
+def update_sql(table: str, columns: tuple[str, ...], condition: str) -> str:
+    set_clause = ", ".join(f"{quote_ident(col)} = ${i + 1}" for i, col in enumerate(columns))
+    return f"UPDATE {quote_ident(table)} SET {set_clause} WHERE {quote_ident(condition)} = ${len(columns) + 1}"
+
+
+@lru_cache(maxsize=512)
+def update_from_values_sql(
+    table: str, key: str, columns: tuple[str, ...], types: tuple[str, ...]
+) -> str:
+    # types line up with (key, *columns)
+    all_columns = (key,) + columns
+    arrays = ", ".join(f"${i + 1}::{sql_type}[]" for i, sql_type in enumerate(types))
+    names = ", ".join(quote_ident(col) for col in all_columns)
+    set_clause = ", ".join(f"{quote_ident(col)} = v.{quote_ident(col)}" for col in columns)
+    return (
+        f"UPDATE {quote_ident(table)} AS t SET {set_clause} "
+        f"FROM unnest({arrays}) AS v({names}) "
+        f"WHERE t.{quote_ident(key)} = v.{quote_ident(key)}"
+    )
+
+
+@lru_cache(maxsize=512)
+def on_conflict_sql(
+    columns: tuple[str, ...], conflict_target: tuple[str, ...], update: bool
+) -> str:
+    target = ", ".join(quote_ident(col) for col in conflict_target)
+    if not update:
+        return f" ON CONFLICT ({target}) DO NOTHING"
+    assignments = ", ".join(
+        f"{quote_ident(col)} = EXCLUDED.{quote_ident(col)}"
+        for col in columns
+        if col not in conflict_target
+    )
+    return f" ON CONFLICT ({target}) DO UPDATE SET {assignments}"
+
+
+async def _chunks(records, size: int):
+    """Groups an iterable or async iterable of records into lists of `size`."""
+    chunk = []
+    if hasattr(records, "__aiter__"):
+        async for record in records:
+            chunk.append(record)
+            if len(chunk) >= size:
+                yield chunk
+                chunk = []
+    else:
+        for record in records:
+            chunk.append(record)
+            if len(chunk) >= size:
+                yield chunk
+                chunk = []
+    if chunk:
+        yield chunk
+
+
+def _affected(status: str) -> int:
+    # Command tags look like "INSERT 0 42", "COPY 42", "UPDATE 42"
+    try:
+        return int(status.rsplit(" ", 1)[-1])
+    except (AttributeError, ValueError):
+        return 0
+
+
+ROW_FORMATS = {
+    "dict": dict,
+    "record": lambda record: record,
+    "tuple": tuple,
 }
 
+
 class PostgresAdapter:
     """
     A class to manage PostgreSQL database operations with asyncpg.
 
+    SQL text is generated once per (table, column-set) shape and reused, so
+    asyncpg's per-connection statement cache skips parse/plan on repeats.
+    Table column lists are cached until `inject()` or `invalidate_columns()`.
+
     Attributes:
         pool (asyncpg.pool.Pool): The connection pool for the PostgreSQL database.
     """
@@ -24,19 +128,32 @@ class PostgresAdapter:
         The pool will be created asynchronously when the `create_pool` method is called.
         """
         self.pool = None
+        self._columns: dict[str, list[str]] = {}
+        self._types: dict[str, dict[str, str]] = {}
 
-    async def create_pool(self, db_params: dict) -> None:
+    async def create_pool(self, db_params: dict | None = None, settings: PoolSettings | None = None) -> None:
         """
         Creates the connection pool for PostgreSQL.
 
+        The pool is wrapped in an `InstrumentedPool` (registered as "raw") so
+        its size, in-use connections and acquire waits show up in pool stats.
+
         Args:
-            db_params (dict): Database connection parameters.
+            db_params (dict | None): Explicit asyncpg.create_pool parameters. `statement_cache_size`
+                (prepared statements kept per connection) defaults to STATEMENT_CACHE_SIZE.
+            settings (PoolSettings | None): Shared pool settings; used when db_params is
+                not given, defaulting to `PoolSettings.from_config("raw")`.
 
         Raises:
             ValueError: If the connection to the database fails.
         """
         try:
-            self.pool = await asyncpg.create_pool(**db_params)
+            if db_params is None:
+                settings = settings or PoolSettings.from_config("raw")
+                db_params = settings.asyncpg_kwargs()
+            db_params = {"statement_cache_size": STATEMENT_CACHE_SIZE, **db_params}
+            timeout = settings.acquire_timeout if settings else None
+            self.pool = InstrumentedPool(await asyncpg.create_pool(**db_params), "raw", acquire_timeout=timeout)
             # logger.info("PostgreSQL connection pool created successfully")
         except Exception as e:
             raise ValueError(f"Failed to create connection pool: {e}") from e
@@ -67,6 +184,10 @@ class PostgresAdapter:
 
             async with self.pool.acquire() as conn:
                 await conn.execute(byte_str)
+            # Prepared statements on pooled connections may reference the old
+            # schema: recycle the connections and forget the column lists
+            await self.pool.expire_connections()
+            self.invalidate_columns()
             # logger.info("Schema loaded successfully.")
         except Exception as e:
             # logger.info(f"Error: {e}")
@@ -80,11 +201,7 @@ class PostgresAdapter:
             table (str): The name of the table to insert into.
             record (dict): A dictionary representing the record to be inserted.
         """
-        columns = ", ".join(record.keys())
-        values = ", ".join(
-            ["$" + str(i + 1) for i in range(len(record))]
-        )  # Placeholder for parameterized query
-        sql_query = f'INSERT INTO "{table}" ({columns}) VALUES ({values})'
+        sql_query = insert_sql(table, tuple(record))
 
         try:
             async with self.pool.acquire() as conn:
@@ -95,6 +212,107 @@ class PostgresAdapter:
         except Exception as e:
             raise ValueError(f"Error inserting record: {e}") from e
 
+    async def bulk_insert(
+        self,
+        table: str,
+        records: Iterable | AsyncIterable,
+        columns: list[str] | None = None,
+        chunk_size: int = 5000,
+        method: str = "auto",
+        conflict_target: list[str] | None = None,
+        on_conflict: str | None = None,
+    ) -> int:
+        """
+        Loads many records into a table in one transaction, streaming them in chunks.
+
+        Records may be dicts (columns taken from the first one) or tuples in
+        `columns` order, from a plain or async iterable; only one chunk is
+        held in memory at a time.
+
+        Args:
+            table (str): Target table.
+            records (Iterable | AsyncIterable): The rows to load.
+            columns (list[str] | None): Column order; required for tuple records.
+            chunk_size (int): Rows per COPY / executemany batch.
+            method (str): "copy" (binary COPY), "executemany", or "auto" (COPY,
+                falling back to executemany if the server or a type rejects it).
+            conflict_target (list[str] | None): Unique columns for upserts.
+            on_conflict (str | None): None (fail on duplicates), "nothing" or "update".
+
+        Returns:
+            int: Number of rows written.
+
+        Raises:
+            ValueError: If the load fails; the whole transaction is rolled back.
+        """
+        if method not in ("auto", "copy", "executemany"):
+            raise ValueError(f"Unknown bulk insert method: {method}")
+        if on_conflict not in (None, "nothing", "update"):
+            raise ValueError(f"Unknown on_conflict mode: {on_conflict}")
+        if on_conflict and not conflict_target:
+            raise ValueError("conflict_target is required with on_conflict")
+
+        written = 0
+        use_copy = method != "executemany"
+        try:
+            async with self.pool.acquire() as conn, conn.transaction():
+                async for chunk in _chunks(records, chunk_size):
+                    if columns is None:
+                        columns = list(chunk[0].keys()) if isinstance(chunk[0], dict) else None
+                        if columns is None:
+                            raise ValueError("columns must be given for tuple records")
+                    rows = [
+                        tuple(record[col] for col in columns) if isinstance(record, dict) else tuple(record)
+                        for record in chunk
+                    ]
+
+                    if use_copy:
+                        try:
+                            # Savepoint, so a rejected COPY can fall back without aborting the load
+                            async with conn.transaction():
+                                written += await self._copy_chunk(conn, table, columns, rows, conflict_target, on_conflict)
+                            continue
+                        except (asyncpg.PostgresError, asyncpg.InterfaceError, TypeError) as e:
+                            if method == "copy":
+                                raise
+                            # logger.info(f"COPY unavailable, falling back to executemany: {e}")
+                            use_copy = False
+
+                    sql_query = insert_sql(table, tuple(columns))
+                    if on_conflict:
+                        sql_query += on_conflict_sql(tuple(columns), tuple(conflict_target), on_conflict == "update")
+                    await conn.executemany(sql_query, rows)
+                    written += len(rows)
+        except ValueError:
+            raise
+        except Exception as e:
+            raise ValueError(f"Error bulk inserting into {table}: {e}") from e
+        return written
+
+    async def _copy_chunk(self, conn, table, columns, rows, conflict_target, on_conflict) -> int:
+        schema, _, name = table.rpartition(".")
+        if not on_conflict:
+            status = await conn.copy_records_to_table(
+                name, records=rows, columns=columns, schema_name=schema or None
+            )
+            return _affected(status)
+
+        # COPY cannot upsert: stage the chunk in a temp table, then merge it.
+        # The staging table only has the loaded columns (no defaults/constraints).
+        staging = "_bulk_stage"
+        cols = ", ".join(quote_ident(col) for col in columns)
+        await conn.execute(
+            f"CREATE TEMP TABLE IF NOT EXISTS {staging} ON COMMIT DROP AS "
+            f"SELECT {cols} FROM {quote_ident(table)} WITH NO DATA"
+        )
+        await conn.execute(f"TRUNCATE {staging}")
+        await conn.copy_records_to_table(staging, records=rows, columns=columns)
+        status = await conn.execute(
+            f"INSERT INTO {quote_ident(table)} ({cols}) SELECT {cols} FROM {staging}"
+            + on_conflict_sql(tuple(columns), tuple(conflict_target), on_conflict == "update")
+        )
+        return _affected(status)
+
     async def all(self, table: str) -> list[dict[str, any]]:
         """
         Fetches all records from a specified table asynchronously.
@@ -105,15 +323,12 @@ class PostgresAdapter:
         Returns:
             List[Dict[str, Any]]: A list of dictionaries representing the records.
         """
-        sql_query = f"SELECT * FROM {table};"
+        sql_query = select_all_sql(table)
         async with self.pool.acquire() as conn:
-            records = await conn.fetch(sql_query)
+            records = await self._fetch(conn, sql_query)
 
         # Convert to a list of dictionaries
-        columns = [desc["name"] for desc in conn.description]
-        results = [dict(zip(columns, record, strict=False)) for record in records]
-
-        return results
+        return [dict(record) for record in records]
 
     async def tables(self) -> list[str]:
         """
@@ -136,35 +351,87 @@ class PostgresAdapter:
 
     async def update(
         self, json: dict[str, any], condition: str, condition_val: str
-    ) -> None:
+    ) -> dict[str, int]:
         """
         Updates records in specified tables based on a condition asynchronously.
 
+        All statements run in one transaction on one connection: either every
+        table is updated or none is.
+
         Args:
             json (dict): A dictionary where keys are table names and values are dictionaries of column-value pairs.
             condition (str): The column name for the WHERE clause.
             condition_val (str): The value to match against the condition.
-        """
-        async with self.pool.acquire() as conn:
-            for table, record in json.items():
-                attrs = record.keys()
-                set_clause = ", ".join(
-                    [f"{attr} = ${i + 1}" for i, attr in enumerate(attrs)]
-                )
-                values = list(record.values())
-                table_name = table
 
-                update_query = f"""
-                    UPDATE {table_name} SET {set_clause}
-                    WHERE {condition} = ${{{len(values) + 1}}}
-                """
+        Returns:
+            dict[str, int]: Rows affected per table.
 
-                try:
-                    await conn.execute(update_query, *values, condition_val)
+        Raises:
+            ValueError: If any statement fails (nothing is applied).
+        """
+        counts = {}
+        try:
+            async with self.pool.acquire() as conn, conn.transaction():
+                for table, record in json.items():
+                    values = list(record.values())
+                    update_query = update_sql(table, tuple(record), condition)
+                    status = await conn.execute(update_query, *values, condition_val)
+                    counts[table] = _affected(status)
                     # logger.info(f"Update on '{table}' successful")
-                except Exception as e:
-                    pass
-                    # logger.info(f"Failed to update record in table '{table}': {e}")
+        except Exception as e:
+            # logger.info(f"Failed to update records: {e}")
+            raise ValueError(f"Error updating records: {e}") from e
+        return counts
+
+    async def update_many(self, table: str, rows: list[dict[str, any]], key: str) -> int:
+        """
+        Updates many rows of one table, each matched by its key column, in one statement.
+
+        Every row must carry the same columns, including `key`. The batch is
+        sent as one typed array per column and joined in a single
+        `UPDATE ... FROM (unnest(...))`, so the statement text (and plan)
+        does not depend on the batch size.
+
+        Returns:
+            int: Rows actually updated, from the statement's command tag; rows
+            whose key matched nothing are not counted.
+
+        Raises:
+            ValueError: If the update fails (nothing is applied).
+        """
+        if not rows:
+            return 0
+
+        columns = tuple(col for col in rows[0] if col != key)
+        all_columns = (key,) + columns
+        try:
+            async with self.pool.acquire() as conn:
+                types = await self._column_types(conn, table)
+                sql_query = update_from_values_sql(
+                    table, key, columns, tuple(types[col] for col in all_columns)
+                )
+                arrays = [[row[col] for row in rows] for col in all_columns]
+                return _affected(await conn.execute(sql_query, *arrays))
+        except Exception as e:
+            raise ValueError(f"Error updating {table}: {e}") from e
+
+    async def _fetch(self, conn, query: str, *args: Any) -> list:
+        # Every statement of exec/fetch/find_by/all goes through here (and
+        # iter_query reports its cursors the same way), feeding the slow-query
+        # log and the request's query budget
+        stats = metrics.current.get()
+        if stats is not None:
+            stats.raw_queries += 1
+        start = time.perf_counter()
+        rows = await conn.fetch(query, *args)
+        query_log.observe(query, args, time.perf_counter() - start, len(rows), self._explain)
+        return rows
+
+    async def _explain(self, query: str, args: tuple) -> list[str]:
+        """Plan lines of `EXPLAIN (ANALYZE, BUFFERS)` for a statement and its parameters."""
+        async with self.pool.acquire() as conn:
+            rows = await conn.fetch(f"EXPLAIN (ANALYZE, BUFFERS) {query}", *args)
+        return [row[0] for row in rows]
 
     async def exec(self, query: str) -> None:
         """
@@ -178,32 +445,78 @@ class PostgresAdapter:
         """
         try:
             async with self.pool.acquire() as conn:
-                result = await conn.fetch(query)
+                result = await self._fetch(conn, query)
             return result
         except Exception as e:
             # logger.info(f"Failed to execute query: {e}")
             raise OSError(f"Failed to execute query: {e}") from e
 
+    async def fetch(self, query: str, *args: Any) -> list[dict[str, Any]]:
+        """
+        Runs a parameterized query and returns its rows as dicts.
+
+        Args:
+            query (str): The SQL query, with $1, $2, ... placeholders.
+            *args (Any): Query parameters.
+
+        Returns:
+            list[dict[str, any]]: The result rows.
+        """
+        async with self.pool.acquire() as conn:
+            rows = await self._fetch(conn, query, *args)
+        return [dict(row) for row in rows]
+
     async def attrs(self, table_name: str) -> list[str]:
         """
         Retrieves the column names for a specified table asynchronously.
 
+        The result is cached per table until `invalidate_columns()` (called by `inject()`).
+
         Args:
             table_name (str): The name of the table.
 
         Returns:
             List[str]: A list of column names.
         """
+        if table_name in self._columns:
+            return list(self._columns[table_name])
+
         async with self.pool.acquire() as conn:
-            column_names = await conn.fetch(f"""
+            column_names = await conn.fetch("""
                 SELECT column_name 
                 FROM information_schema.columns 
-                WHERE table_schema = 'public' AND table_name='{table_name}'
-            """)
+                WHERE table_schema = 'public' AND table_name = $1
+                ORDER BY ordinal_position
+            """, table_name)
 
         column_names = [row["column_name"] for row in column_names]
         # logger.info("Column Names: ", column_names)
-        return column_names
+        self._columns[table_name] = column_names
+        return list(column_names)
+
+    async def _column_types(self, conn, table_name: str) -> dict[str, str]:
+        """Column name -> SQL type (e.g. "character varying(50)"), cached like `attrs`."""
+        if table_name not in self._types:
+            rows = await conn.fetch("""
+                SELECT attname, format_type(atttypid, atttypmod) AS type
+                FROM pg_attribute
+                WHERE attrelid = $1::regclass AND attnum > 0 AND NOT attisdropped
+            """, quote_ident(table_name))
+            self._types[table_name] = {row["attname"]: row["type"] for row in rows}
+        return self._types[table_name]
+
+    def invalidate_columns(self, table_name: str | None = None) -> None:
+        """
+        Drops cached column metadata, for one table or all of them.
+
+        Call after changing a schema outside `inject()`.
+        """
+        if table_name is None:
+            self._columns.clear()
+            self._types.clear()
+        else:
+            self._columns.pop(table_name, None)
+            self._types.pop(table_name, None)
 
     async def find_by(self, table_: str, attr_: str, val: any) -> list[dict[str, any]]:
         """
@@ -217,15 +530,77 @@ class PostgresAdapter:
         Returns:
             List[Dict[str, Any]]: A list of dictionaries representing the matching records.
         """
-        table = table_
-        attr = attr_
-        query = f"SELECT * FROM {table} WHERE {attr} = $1"
+        query = find_by_sql(table_, attr_)
 
         async with self.pool.acquire() as conn:
-            result = await conn.fetch(query, val)
+            result = await self._fetch(conn, query, val)
 
         # Convert results to a list of dictionaries
-        columns = [desc["name"] for desc in conn.description]
-        records = [dict(zip(columns, record, strict=False)) for record in result]
+        return [dict(record) for record in result]
+
+    async def iter_query(
+        self,
+        query: str,
+        *args: Any,
+        prefetch: int = 500,
+        batch_size: int | None = None,
+        row_format: str = "dict",
+    ) -> AsyncIterator[Any]:
+        """
+        Streams a query's results through a server-side cursor.
 
-        return records
+        The cursor lives in a transaction on one pooled connection, so memory
+        stays constant however many rows the query returns. The connection is
+        held until the generator is exhausted or closed; wrap early-exiting
+        loops in `contextlib.aclosing`.
+
+        Args:
+            query (str): The SQL query.
+            *args (Any): Query parameters.
+            prefetch (int): Rows fetched per round trip when yielding rows one by one.
+            batch_size (int | None): If set, yield lists of up to this many rows instead.
+            row_format (str): "dict", "record" (asyncpg Record) or "tuple".
+
+        Yields:
+            A row (or a list of rows with batch_size) in the requested format.
+        """
+        if row_format not in ROW_FORMATS:
+            raise ValueError(f"Unknown row format: {row_format}")
+        convert = ROW_FORMATS[row_format]
+
+        # Counted and logged like `_fetch`, once the cursor is done; the time
+        # is what the fetches took, not what the caller spent between rows
+        stats = metrics.current.get()
+        if stats is not None:
+            stats.raw_queries += 1
+        seconds, count = 0.0, 0
+        async with self.pool.acquire() as conn, conn.transaction():
+            start = time.perf_counter()
+            cursor = await conn.cursor(query, *args)
+            seconds += time.perf_counter() - start
+            try:
+                while True:
+                    start = time.perf_counter()
+                    rows = await cursor.fetch(batch_size or prefetch)
+                    seconds += time.perf_counter() - start
+                    if not rows:
+                        break
+                    count += len(rows)
+                    if batch_size:
+                        yield [convert(row) for row in rows]
+                    else:
+                        for row in rows:
+                            yield convert(row)
+            finally:
+                if stats is not None:
+                    stats.pg_calls += 1
+                    stats.pg_seconds += seconds
+                query_log.observe(query, args, seconds, count, self._explain)
+
+    def iter_all(self, table: str, **kwargs: Any) -> AsyncIterator[Any]:
+        """Streaming variant of `all`. Takes the same options as `iter_query`."""
+        return self.iter_query(select_all_sql(table), **kwargs)
+
+    def iter_find_by(self, table_: str, attr_: str, val: any, **kwargs: Any) -> AsyncIterator[Any]:
+        """Streaming variant of `find_by`. Takes the same options as `iter_query`."""
+        return self.iter_query(find_by_sql(table_, attr_), val, **kwargs)
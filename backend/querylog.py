@@ -0,0 +1,189 @@
+# Python
+import asyncio
+import logging
+import random
+import re
+from typing import Any, Awaitable, Callable
+# Application Code
+from backend import metrics
+
+logger = logging.getLogger(__name__)
+
+# String and numeric literals; $n placeholders and quoted identifiers are kept
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"(?<![\w$.\"])\d+(?:\.\d+)?\b")
+# Plan lines that can carry the query's (inlined) parameters; costs, row
+# counts, timings and buffer figures on every other line are kept as is
+_PLAN_CONDITIONS = re.compile(
+    r"^\s*(?:->\s*)?(?:Filter|Index Cond|Recheck Cond|Join Filter|Hash Cond|Merge Cond|One-Time Filter):"
+)
+# Concurrent EXPLAIN runs per worker; more sampled queries are skipped while they run
+MAX_PENDING_EXPLAINS = 2
+
+Explain = Callable[[str, Any], Awaitable[list[str]]]
+
+
+class QueryBudgetExceeded(RuntimeError):
+    """A request ran more queries than its route's budget (raised in strict mode only)."""
+
+
+def redact(sql: str) -> str:
+    """SQL text with inline literals replaced by `?`; bound parameters are never logged."""
+    return _NUMBER_LITERAL.sub("?", _STRING_LITERAL.sub("?", sql))
+
+
+def redact_plan(plan: list[str]) -> str:
+    """EXPLAIN output with literals redacted in its condition lines only."""
+    return "\n".join(redact(line) if _PLAN_CONDITIONS.match(line) else line for line in plan)
+
+
+def explainable(sql: str) -> bool:
+    # EXPLAIN ANALYZE executes the statement, so only plain reads are re-run
+    head = sql.lstrip().upper()
+    return head.startswith("SELECT") and " FOR UPDATE" not in head and " FOR SHARE" not in head
+
+
+def parse_budgets(spec: str) -> dict[str, int]:
+    """
+    Parses "GET /games=3,GET /dashboard=4" into {"GET /games": 3, ...}.
+
+    Raises:
+        ValueError: If an entry is not "METHOD /route=N".
+    """
+    budgets = {}
+    for entry in filter(None, (part.strip() for part in spec.split(","))):
+        route, _, limit = entry.rpartition("=")
+        parts = route.split()
+        if len(parts) != 2 or not limit.strip().isdigit():
+            raise ValueError(f"Invalid query budget {entry!r}, expected 'METHOD /route=N'")
+        budgets[f"{parts[0].upper()} {parts[1]}"] = int(limit)
+    return budgets
+
+
+class QueryLog:
+    """
+    Slow-query log and per-route query budgets for ORM and raw SQL.
+
+    Fed by the metrics instrumentation (Tortoise statements) and by
+    PostgresAdapter.exec/fetch/find_by/iter_query. A statement slower than
+    `slow_ms` is logged with its redacted SQL, duration, row count and route; a
+    `explain_sample` fraction of the slow SELECTs is re-run under
+    `EXPLAIN (ANALYZE, BUFFERS)` in the background and the plan logged.
+
+    A request's queries (ORM plus raw) are counted against the budget of
+    its route (`budgets`, else `default_budget`; 0 means unlimited). Going
+    over is logged once per request, or raises `QueryBudgetExceeded` when
+    `strict` is set, so tests and CI fail on a new N+1.
+    """
+
+    def __init__(self):
+        self.slow_ms = 0.0
+        self.explain_sample = 0.0
+        self.budgets: dict[str, int] = {}
+        self.default_budget = 0
+        self.strict = False
+        self._explains: set[asyncio.Task] = set()
+
+    def configure(
+        self,
+        slow_ms: float,
+        explain_sample: float = 0.0,
+        budgets: dict[str, int] | None = None,
+        default_budget: int = 0,
+        strict: bool = False,
+    ) -> None:
+        """Apply settings. Called from the lifespan."""
+        self.slow_ms = slow_ms
+        self.explain_sample = explain_sample
+        self.budgets = budgets or {}
+        self.default_budget = default_budget
+        self.strict = strict
+
+    def observe(
+        self, sql: str, params: Any, seconds: float, rows: int | None, explain: Explain | None = None
+    ) -> None:
+        """
+        Record one statement run during the current request (if any).
+
+        Args:
+            sql (str): The statement as sent, placeholders included.
+            params (Any): Its bound parameters; only used to re-run it for EXPLAIN.
+            seconds (float): How long it took.
+            rows (int | None): Rows returned, when known.
+            explain (Explain | None): Runs `EXPLAIN (ANALYZE, BUFFERS)` on (sql, params)
+                and returns the plan lines; None if the backend cannot.
+
+        Raises:
+            QueryBudgetExceeded: In strict mode, when the route's budget is exceeded.
+        """
+        stats = metrics.current.get()
+        route = f"{stats.scope['method']} {stats.route}" if stats is not None else "<background>"
+
+        if self.slow_ms and seconds * 1000 >= self.slow_ms:
+            if stats is not None:
+                stats.slow_queries += 1
+            logger.warning(
+                "Slow query %.1f ms, %s rows, on %s: %s",
+                seconds * 1000, "?" if rows is None else rows, route, redact(sql),
+            )
+            if (
+                explain is not None
+                and self.explain_sample
+                and len(self._explains) < MAX_PENDING_EXPLAINS
+                and explainable(sql)
+                and random.random() < self.explain_sample
+            ):
+                task = asyncio.create_task(self._explain(explain, sql, params, route))
+                self._explains.add(task)
+                task.add_done_callback(self._explains.discard)
+
+        if stats is None:
+            return
+        budget = self.budgets.get(route, self.default_budget)
+        queries = stats.db_queries + stats.raw_queries
+        if budget and queries > budget and not stats.over_budget:
+            stats.over_budget = True
+            message = f"{route} ran {queries} queries, over its budget of {budget}; last: {redact(sql)}"
+            if self.strict:
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+
+    def observe_orm(self, client: Any, sql: str, params: Any, seconds: float, result: Any) -> None:
+        """`metrics.instrument_tortoise` hook for Tortoise statements."""
+        if isinstance(result, tuple) and len(result) == 2 and isinstance(result[1], list):
+            rows = len(result[1])  # execute_query: (rowcount, rows)
+        elif isinstance(result, list):
+            rows = len(result)
+        else:
+            rows = None
+        explain = None
+        if getattr(getattr(client, "capabilities", None), "dialect", None) == "postgres":
+            explain = _tortoise_explain(getattr(client, "connection_name", "default"))
+        self.observe(sql, params, seconds, rows, explain)
+
+    async def _explain(self, explain: Explain, sql: str, params: Any, route: str) -> None:
+        # This task copied the request's context; detach it so the EXPLAIN
+        # is neither counted against the request nor logged as slow again
+        metrics.current.set(None)
+        try:
+            plan = await explain(sql, params)
+        except Exception as e:
+            logger.warning("EXPLAIN of slow query on %s failed: %s", route, e)
+            return
+        # Custom plans inline the bound parameters into Filter/Index Cond lines
+        logger.warning("Plan of slow query on %s: %s\n%s", route, redact(sql), redact_plan(plan))
+
+
+def _tortoise_explain(connection_name: str) -> Explain:
+    async def explain(sql: str, params: Any) -> list[str]:
+        from tortoise import connections
+
+        # A fresh client from the pool: a transaction the query ran in may be over by now
+        client = connections.get(connection_name)
+        rows = await client.execute_query_dict(f"EXPLAIN (ANALYZE, BUFFERS) {sql}", params)
+        return [row["QUERY PLAN"] for row in rows]
+
+    return explain
+
+
+query_log = QueryLog()
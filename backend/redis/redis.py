@@ -1,7 +1,9 @@
 # Python Native
+import asyncio
 import builtins
 import logging
-from typing import Any
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable
 import os
 # Dependency Librarys
 import redis.asyncio as redis
@@ -16,20 +18,137 @@ REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379")
 # :password@ → optional authentication
 # /db → optional DB index (see below)
 
-# TODO: May want to add group/tenant in the future tenant:session:user: etc...
+# Keys are namespaced as [tenant:]namespace:part:... by KeyBuilder below
 
 # TODO: Adding a connect method may be ideal as well
 
 
+DEFAULT_SCAN_COUNT = 1000
+
+_GLOB_SPECIAL = str.maketrans({c: "\\" + c for c in "*?[]\\"})
+
+
+class KeyBuilder:
+    """
+    Builds namespaced keys of the form `[tenant:]namespace:part:...`.
+
+    Every key the app writes goes through one of these, so a namespace (and
+    a tenant) can be scanned, expired or deleted on its own without touching
+    anything else in the database.
+    """
+
+    def __init__(self, tenant: str = "", separator: str = ":"):
+        self.tenant = tenant
+        self.separator = separator
+
+    def __call__(self, namespace: str, *parts: Any) -> str:
+        segments = [self.tenant] if self.tenant else []
+        segments.append(namespace)
+        segments.extend(str(part) for part in parts)
+        return self.separator.join(segments)
+
+    def pattern(self, namespace: str, *parts: Any) -> str:
+        """SCAN MATCH pattern for every key under namespace (and parts)."""
+        prefix = self(namespace, *parts).translate(_GLOB_SPECIAL)
+        return prefix + self.separator + "*"
+
+
+class RedisBatch:
+    """
+    Commands queued on a pipeline, sent in one round trip when the
+    `RedisAdapter.pipeline()` block exits.
+
+    Any redis-py command can be queued (`batch.set(...)`, `batch.hset(...)`);
+    they are not awaited. After the block, `results` holds one reply per
+    queued command, in order.
+    """
+
+    def __init__(self, pipe: redis.client.Pipeline):
+        self.pipe = pipe
+        self.results: list[Any] = []
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.pipe, name)
+
+    def __len__(self) -> int:
+        return len(self.pipe)
+
+    async def execute(self) -> list[Any]:
+        self.results = await self.pipe.execute() if len(self.pipe) else []
+        return self.results
+
+
+class GetCoalescer:
+    """
+    Merges concurrent GETs into MGETs, dataloader style.
+
+    Every `get` made before the event loop gets back to this coalescer (the
+    same loop tick) is queued, then sent as one MGET of up to `max_batch`
+    keys. Callers asking for the same key share one slot in the batch.
+    """
+
+    def __init__(self, conn: redis.Redis, max_batch: int = 512):
+        self.conn = conn
+        self.max_batch = max_batch
+        self._pending: dict[str, list[asyncio.Future]] = {}
+        self._scheduled = False
+        # Strong references: the loop only keeps weak ones to running tasks
+        self._flushes: set[asyncio.Task] = set()
+
+    async def get(self, key: str) -> str | None:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.setdefault(key, []).append(future)
+        if not self._scheduled:
+            self._scheduled = True
+            loop.call_soon(self._dispatch)
+        return await future
+
+    def _dispatch(self) -> None:
+        pending, self._pending = self._pending, {}
+        self._scheduled = False
+        keys = list(pending)
+        for start in range(0, len(keys), self.max_batch):
+            chunk = {key: pending[key] for key in keys[start:start + self.max_batch]}
+            task = asyncio.ensure_future(self._flush(chunk))
+            self._flushes.add(task)
+            task.add_done_callback(self._flush_done)
+
+    def _flush_done(self, task: asyncio.Task) -> None:
+        self._flushes.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("Coalesced MGET flush failed: %s", task.exception())
+
+    async def _flush(self, pending: dict[str, list[asyncio.Future]]) -> None:
+        try:
+            values = await self.conn.mget(list(pending))
+        except Exception as e:
+            logger.error("Redis MGET failed for %d coalesced keys: %s", len(pending), str(e))
+            for futures in pending.values():
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(e)
+            return
+        for futures, value in zip(pending.values(), values):
+            for future in futures:
+                if not future.done():
+                    future.set_result(value)
+
+
 class RedisAdapter:
     """
     Async wrapper for Redis operations, supporting common key-value and set methods.
     Used for caching, sessions, locking, and more.
+
+    With `coalesce_gets=True`, concurrent `get` calls made in the same event
+    loop tick are merged into a single MGET (see `GetCoalescer`).
     """
 
-    def __init__(self, url: str = REDIS_URL):
+    def __init__(self, url: str = REDIS_URL, coalesce_gets: bool = False, tenant: str = ""):
         self.conn: redis.Redis = redis.Redis.from_url(url, decode_responses=True)
         # redis.Redis(host="localhost", port=6379, db=2)
+        self.coalescer = GetCoalescer(self.conn) if coalesce_gets else None
+        self.key = KeyBuilder(tenant)
 
     async def set(self, key: str, val: Any, ex: int = 3600, nx: bool = False) -> bool:
         """
@@ -63,12 +182,107 @@ class RedisAdapter:
         Returns:
             (str | None): The stored value or None.
         """
+        if self.coalescer is not None:
+            return await self.coalescer.get(key)
         try:
             return await self.conn.get(key)
         except Exception as e:
             logger.error("Redis GET failed for key '%s': %s", key, str(e))
             raise
 
+    async def mget(self, keys: list[str]) -> list[str | None]:
+        """
+        Retrieve several values in one round trip.
+
+        Args:
+            keys (list[str]): The Redis keys.
+
+        Returns:
+            list[str | None]: Values in the same order as keys (None if missing).
+        """
+        if not keys:
+            return []
+        try:
+            return await self.conn.mget(keys)
+        except Exception as e:
+            logger.error("Redis MGET failed for %d keys: %s", len(keys), str(e))
+            raise
+
+    async def mset(self, mapping: dict[str, Any], ex: int | None = None) -> bool:
+        """
+        Store several values in one round trip.
+
+        MSET has no expiry option, so with `ex` the SETs are pipelined instead.
+
+        Args:
+            mapping (dict): Key/value pairs to store.
+            ex (int | None): Optional expiry in seconds applied to every key.
+
+        Returns:
+            bool: True if successful.
+        """
+        if not mapping:
+            return True
+        try:
+            if ex is None:
+                return bool(await self.conn.mset(mapping))
+            async with self.conn.pipeline(transaction=False) as pipe:
+                for key, val in mapping.items():
+                    pipe.set(key, val, ex=ex)
+                return all(await pipe.execute())
+        except Exception as e:
+            logger.error("Redis MSET failed for %d keys: %s", len(mapping), str(e))
+            raise
+
+    async def mdelete(self, *keys: str) -> int:
+        """Delete several keys in one round trip. Returns the number deleted."""
+        if not keys:
+            return 0
+        try:
+            return await self.conn.delete(*keys)
+        except Exception as e:
+            logger.error("Redis DELETE failed for %d keys: %s", len(keys), str(e))
+            raise
+
+    @asynccontextmanager
+    async def pipeline(self, transaction: bool = False) -> AsyncIterator[RedisBatch]:
+        """
+        Queue commands and send them in a single round trip on exit.
+
+        Args:
+            transaction (bool): Wrap the batch in MULTI/EXEC so it applies atomically.
+
+        Example:
+            async with kv.pipeline() as batch:
+                batch.hset(key, mapping=fields)
+                batch.expire(key, ttl)
+            batch.results  # [fields_added, True]
+        """
+        async with self.conn.pipeline(transaction=transaction) as pipe:
+            batch = RedisBatch(pipe)
+            yield batch
+            try:
+                await batch.execute()
+            except Exception as e:
+                logger.error("Redis pipeline of %d commands failed: %s", len(batch), str(e))
+                raise
+
+    async def transaction(
+        self, func: Callable[[redis.client.Pipeline], Awaitable[Any]], *watches: str
+    ) -> Any:
+        """
+        Run an optimistic (WATCH/MULTI/EXEC) transaction, retrying on conflicts.
+
+        `func` receives a pipeline already WATCHing `watches`; it may read
+        with immediate commands, must call `pipe.multi()` before queueing the
+        writes, and its return value is passed back.
+        """
+        try:
+            return await self.conn.transaction(func, *watches, value_from_callable=True)
+        except Exception as e:
+            logger.error("Redis transaction failed for keys %s: %s", watches, str(e))
+            raise
+
     async def delete(self, key: str) -> bool:
         """
         Delete a key from Redis.
@@ -157,6 +371,95 @@ class RedisAdapter:
             logger.error("Redis SMEMBERS failed for key '%s': %s", key, str(e))
             raise
 
+    async def hset(self, key: str, mapping: dict[str, Any]) -> int:
+        """
+        Set one or more fields of a Redis hash.
+
+        Args:
+            key (str): The Redis key.
+            mapping (dict): Field/value pairs to write.
+
+        Returns:
+            int: Number of fields that were newly created.
+        """
+        try:
+            return await self.conn.hset(key, mapping=mapping)
+        except Exception as e:
+            logger.error("Redis HSET failed for key '%s': %s", key, str(e))
+            raise
+
+    async def hgetall(self, key: str) -> dict[str, str]:
+        """
+        Get every field and value of the hash at key (empty dict if missing).
+
+        Raises:
+            redis.ResponseError: e.g. WRONGTYPE if the key holds another type.
+                Not logged, callers migrating old string keys handle it.
+        """
+        try:
+            return await self.conn.hgetall(key)
+        except redis.ResponseError:
+            raise
+        except Exception as e:
+            logger.error("Redis HGETALL failed for key '%s': %s", key, str(e))
+            raise
+
+    async def hdel(self, key: str, *fields: str) -> int:
+        """Delete one or more fields of the hash at key. Returns the number removed."""
+        try:
+            return await self.conn.hdel(key, *fields)
+        except Exception as e:
+            logger.error("Redis HDEL failed for key '%s': %s", key, str(e))
+            raise
+
+    async def expire(self, key: str, seconds: int) -> bool:
+        """Set a key's time to live in seconds. Returns False if the key does not exist."""
+        try:
+            return bool(await self.conn.expire(key, seconds))
+        except Exception as e:
+            logger.error("Redis EXPIRE failed for key '%s': %s", key, str(e))
+            raise
+
+    async def ttl(self, key: str) -> int:
+        """Remaining time to live of a key in seconds (-1 no expiry, -2 missing)."""
+        try:
+            return await self.conn.ttl(key)
+        except Exception as e:
+            logger.error("Redis TTL failed for key '%s': %s", key, str(e))
+            raise
+
+    async def rename(self, key: str, new_key: str) -> None:
+        """Atomically rename a key, overwriting new_key whatever its type."""
+        try:
+            await self.conn.rename(key, new_key)
+        except Exception as e:
+            logger.error("Redis RENAME failed for key '%s': %s", key, str(e))
+            raise
+
+    def script(self, source: str) -> Callable[..., Awaitable[Any]]:
+        """
+        Register a Lua script and return an async callable that runs it.
+
+        The callable takes `keys` and `args` sequences and runs the script
+        atomically on the server with EVALSHA, loading it on first use.
+
+        Args:
+            source (str): The Lua source.
+
+        Returns:
+            Callable: `await run(keys=[...], args=[...])`.
+        """
+        lua = self.conn.register_script(source)
+
+        async def run(keys=(), args=()):
+            try:
+                return await lua(keys=list(keys), args=list(args))
+            except Exception as e:
+                logger.error("Redis script %s failed for keys %s: %s", lua.sha, keys, str(e))
+                raise
+
+        return run
+
     async def acquire_lock(self, key: str, ttl: int) -> bool:
         """Try to acquire a distributed lock on a key."""
         try:
@@ -173,31 +476,153 @@ class RedisAdapter:
             logger.error("Redis LOCK release failed for key '%s': %s", key, str(e))
             raise
 
+    async def scan_batches(
+        self, pattern: str = "*", count: int = DEFAULT_SCAN_COUNT
+    ) -> AsyncIterator[list[str]]:
+        """
+        Iterate the key space with SCAN, yielding one page of keys at a time.
+
+        Never blocks the server like KEYS does. A key may be yielded more than
+        once if the key space changes during the scan.
+
+        Args:
+            pattern (str): MATCH pattern.
+            count (int): COUNT hint, i.e. roughly how many keys each page examines.
+
+        Yields:
+            list[str]: The (possibly empty) keys of each non-empty page.
+        """
+        cursor = 0
+        while True:
+            try:
+                cursor, chunk = await self.conn.scan(cursor=cursor, match=pattern, count=count)
+            except Exception as e:
+                logger.error("Redis SCAN failed for pattern '%s': %s", pattern, str(e))
+                raise
+            if chunk:
+                yield chunk
+            if cursor == 0:
+                break
+
+    async def scan_iter(self, pattern: str = "*", count: int = DEFAULT_SCAN_COUNT) -> AsyncIterator[str]:
+        """Iterate every key matching pattern with SCAN. See `scan_batches`."""
+        async for chunk in self.scan_batches(pattern, count):
+            for key in chunk:
+                yield key
+
     async def keys(self, pattern: str = "*") -> list[str]:
-        """Return all keys matching a given pattern."""
+        """Return all keys matching a given pattern (via SCAN, not the blocking KEYS)."""
+        return [key async for key in self.scan_iter(pattern)]
+
+    async def query(self, pattern: str, count: int = DEFAULT_SCAN_COUNT) -> list[str]:
+        """
+        Query a pattern using the scan method. More efficient than keys.
+
+        Collects everything into a list; prefer `scan_iter` for large key spaces.
+        """
+        return [key async for key in self.scan_iter(pattern, count)]
+
+    async def unlink_namespace(self, namespace: str, *parts: Any, batch_size: int = DEFAULT_SCAN_COUNT) -> int:
+        """
+        Delete every key under a namespace, one SCAN page at a time.
+
+        Uses UNLINK so memory is reclaimed in the background and the server
+        is never blocked by a large delete.
+
+        Args:
+            namespace (str): The namespace (see `KeyBuilder`).
+            *parts (Any): Optional sub-namespace, e.g. ("session",) or ("ratelimit", "login").
+            batch_size (int): SCAN COUNT hint and upper bound per UNLINK.
+
+        Returns:
+            int: Number of keys removed.
+        """
+        pattern = self.key.pattern(namespace, *parts)
+        removed = 0
+        async for chunk in self.scan_batches(pattern, batch_size):
+            try:
+                removed += await self.conn.unlink(*chunk)
+            except Exception as e:
+                logger.error("Redis UNLINK failed under '%s': %s", pattern, str(e))
+                raise
+        return removed
+
+    async def expire_namespace(
+        self, namespace: str, seconds: int, *parts: Any, batch_size: int = DEFAULT_SCAN_COUNT
+    ) -> int:
+        """
+        Set a TTL on every key under a namespace, one pipelined SCAN page at a time.
+
+        Returns:
+            int: Number of keys whose TTL was set.
+        """
+        pattern = self.key.pattern(namespace, *parts)
+        updated = 0
+        async for chunk in self.scan_batches(pattern, batch_size):
+            async with self.pipeline() as batch:
+                for key in chunk:
+                    batch.expire(key, seconds)
+            updated += sum(1 for ok in batch.results if ok)
+        return updated
+
+    async def publish(self, channel: str, message: str) -> int:
+        """
+        Publish a message on a pub/sub channel.
+
+        Args:
+            channel (str): The channel name.
+            message (str): The message payload.
+
+        Returns:
+            int: Number of subscribers that received the message.
+        """
         try:
-            keys = await self.conn.keys(pattern)
-            return [k if isinstance(k, str) else k.decode() for k in keys]
+            return await self.conn.publish(channel, message)
         except Exception as e:
-            logger.error("Redis KEYS failed for pattern '%s': %s", pattern, str(e))
+            logger.error("Redis PUBLISH failed for channel '%s': %s", channel, str(e))
             raise
 
-    async def query(self, pattern: str) -> list[str]:
+    async def listen(
+        self, channel: str, on_subscribe: Callable[[], None] | None = None
+    ) -> AsyncIterator[str]:
         """
-        Query a pattern using the scan method. More efficient than keys.
+        Subscribe to a channel and yield every message published on it.
+
+        The subscription uses its own connection and is closed when the
+        generator is closed. Connection errors are raised to the caller, which
+        is expected to resubscribe.
+
+        Args:
+            channel (str): The channel name.
+            on_subscribe (Callable): Called once the subscription is active.
+
+        Yields:
+            str: Message payloads.
         """
-        cursor = 0
-        keys = []
-        while True:
-            cursor, chunk = await self.conn.scan(cursor=cursor, match=pattern, count=50)
-            keys.extend(chunk)
-            if cursor == 0:
-                break
-        return keys
+        pubsub = self.conn.pubsub()
+        try:
+            await pubsub.subscribe(channel)
+            if on_subscribe:
+                on_subscribe()
+            async for message in pubsub.listen():
+                if message["type"] == "message":
+                    yield message["data"]
+        finally:
+            await pubsub.aclose()
+
+    async def ping(self) -> bool:
+        """True if the server answers PING."""
+        try:
+            return await self.conn.ping()
+        except Exception as e:
+            logger.error("Redis PING failed: %s", str(e))
+            raise
 
     async def flush(self) -> None:
         """
         Removes all contents of the database.
+
+        Wipes every tenant and namespace; use `unlink_namespace` for scoped cleanup.
         """
         await self.conn.flushdb()
 
@@ -0,0 +1,25 @@
+# Python
+from typing import Any
+# Libraries
+import orjson
+from fastapi.responses import ORJSONResponse
+
+# Non-str dict keys (e.g. user ids) are stringified instead of rejected
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+
+def dumps(content: Any) -> bytes:
+    """
+    Serialize to JSON bytes with orjson.
+
+    datetime, date, UUID and dataclass values (e.g. `created_at`/`updated_at`
+    from `.values()`) are encoded natively as ISO 8601 strings.
+    """
+    return orjson.dumps(content, option=ORJSON_OPTIONS)
+
+
+class JSONResponse(ORJSONResponse):
+    """App-wide JSON response class, rendered with `dumps`."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
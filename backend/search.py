@@ -0,0 +1,131 @@
+# Python
+import hashlib
+import json
+import logging
+from functools import lru_cache
+from typing import Any
+# Application Code
+from backend.postgres.postgres import PostgresAdapter, quote_ident
+from backend.responses import dumps
+
+logger = logging.getLogger(__name__)
+
+SEARCH_COLUMNS = ("game_id", "gameTitle", "category", "platform", "status", "rating")
+
+
+@lru_cache(maxsize=None)
+def search_sql(table: str = "games") -> str:
+    """
+    Ranked fuzzy + prefix search over title, category and platform.
+
+    $1 is the query, $2 the escaped prefix pattern ("zeld%"), $3/$4 the
+    (score, game_id) keyset cursor (NULL for the first page) and $5 the limit.
+    Every predicate can be served by the pg_trgm GIN indexes (`%` and ILIKE).
+    Title matches outrank category/platform matches; prefix matches get a boost.
+    """
+    cols = ", ".join(quote_ident(c) for c in SEARCH_COLUMNS)
+    title, category, platform = quote_ident("gameTitle"), quote_ident("category"), quote_ident("platform")
+    return f"""
+        SELECT * FROM (
+            SELECT {cols},
+                (GREATEST(similarity({title}, $1), 0.8 * similarity({category}, $1), 0.8 * similarity({platform}, $1))
+                 + CASE WHEN {title} ILIKE $2 THEN 1.0 ELSE 0.0 END
+                 + CASE WHEN {category} ILIKE $2 OR {platform} ILIKE $2 THEN 0.5 ELSE 0.0 END
+                )::float8 AS score
+            FROM {quote_ident(table)}
+            WHERE {title} % $1 OR {category} % $1 OR {platform} % $1
+               OR {title} ILIKE $2 OR {category} ILIKE $2 OR {platform} ILIKE $2
+        ) ranked
+        WHERE $3::float8 IS NULL OR score < $3 OR (score = $3 AND game_id > $4::int)
+        ORDER BY score DESC, game_id
+        LIMIT $5
+    """
+
+
+def normalize(q: str) -> str:
+    return " ".join(q.lower().split())
+
+
+def prefix_pattern(q: str) -> str:
+    """ILIKE pattern matching values that start with q, with wildcards in q escaped."""
+    return q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+
+def encode_cursor(row: dict[str, Any]) -> str:
+    return f"{row['score']!r}:{row['game_id']}"
+
+
+def decode_cursor(cursor: str) -> tuple[float, int]:
+    """Raises ValueError on a malformed cursor."""
+    score, game_id = cursor.rsplit(":", 1)
+    return float(score), int(game_id)
+
+
+async def search_games(
+    db: PostgresAdapter, q: str, limit: int, after: str | None = None, table: str = "games"
+) -> dict[str, Any]:
+    """
+    One page of ranked search results, straight from Postgres.
+
+    Args:
+        db (PostgresAdapter): The raw database adapter.
+        q (str): The search text.
+        limit (int): Maximum number of results.
+        after (str | None): The `next` cursor of the previous page.
+        table (str): Table to search (the benchmark uses a scratch copy).
+
+    Returns:
+        dict: {"games": [...], "next": cursor or None}. Each game carries its score.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    q = normalize(q)
+    score, game_id = decode_cursor(after) if after else (None, None)
+    rows = await db.fetch(search_sql(table), q, prefix_pattern(q), score, game_id, limit)
+    next_cursor = encode_cursor(rows[-1]) if len(rows) == limit else None
+    return {"games": rows, "next": next_cursor}
+
+
+class SearchCache:
+    """
+    Short-lived Redis cache of search result pages.
+
+    Entries are not invalidated on writes; with a TTL of a few seconds a hot
+    query hits Postgres at most once per TTL while new games still show up
+    almost immediately.
+    """
+
+    def __init__(self, ttl: int = 30):
+        self.ttl = ttl
+        self.redis = None
+
+    def bind(self, redis) -> None:
+        """Attach the Redis adapter. Called from the lifespan."""
+        self.redis = redis
+
+    def _key(self, q: str, limit: int, after: str | None) -> str:
+        digest = hashlib.sha1(f"{normalize(q)}\0{limit}\0{after or ''}".encode()).hexdigest()
+        return self.redis.key("search", "games", digest)
+
+    async def search(self, db: PostgresAdapter, q: str, limit: int, after: str | None = None) -> dict[str, Any]:
+        """`search_games`, served from Redis when the same page was asked for recently."""
+        if self.redis is None or self.ttl <= 0:
+            return await search_games(db, q, limit, after)
+        key = self._key(q, limit, after)
+        try:
+            cached = await self.redis.get(key)
+        except Exception as e:
+            logger.warning("Search cache unavailable: %s", e)
+            return await search_games(db, q, limit, after)
+        if cached is not None:
+            return json.loads(cached)
+        result = await search_games(db, q, limit, after)
+        try:
+            await self.redis.set(key, dumps(result), ex=self.ttl)
+        except Exception as e:
+            logger.warning("Failed to cache search results: %s", e)
+        return result
+
+
+search_cache = SearchCache()
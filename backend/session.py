@@ -1,9 +1,38 @@
+import asyncio
+import copy
 import json
+import logging
 import random
 import uuid
 from datetime import datetime, timezone
 
-from backend.app.models import User
+from redis.exceptions import ResponseError
+
+from backend.cache import LocalCache
+
+logger = logging.getLogger(__name__)
+
+INVALIDATION_CHANNEL = "session-invalidate"
+CSRF_FIELD_PREFIX = "csrf:"
+
+# Partial save of a hash-stored session, applied only while the session still
+# exists so a save racing a logout cannot bring it back with a fresh TTL.
+# KEYS[1] session key; ARGV: ttl, number of field/value pairs, the pairs, then
+# the field names to delete. Returns 1 if saved, 0 if the session was gone.
+SAVE_FIELDS_LUA = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return 0
+end
+local n_pairs = tonumber(ARGV[2])
+if n_pairs > 0 then
+    redis.call('HSET', KEYS[1], unpack(ARGV, 3, 2 + 2 * n_pairs))
+end
+if #ARGV > 2 + 2 * n_pairs then
+    redis.call('HDEL', KEYS[1], unpack(ARGV, 3 + 2 * n_pairs))
+end
+redis.call('EXPIRE', KEYS[1], ARGV[1])
+return 1
+"""
 
 class CSRFToken:
     def __init__(self, session_id, ttl = 3600):
@@ -16,10 +45,32 @@ class CSRFToken:
     def verify_csrf():
         pass
     
+def _valid_sid(sid) -> bool:
+    # Session ids are uuid4 strings; anything else never touches Redis
+    try:
+        return str(uuid.UUID(sid)) == sid
+    except (TypeError, ValueError):
+        return False
+
 class Session:
+    """
+    A session's data plus the set of fields changed since it was loaded.
+
+    Writes should go through `set`/`delete`/`add_csrf_token`/`remove_csrf_token`
+    so `SessionManager.save_session` can persist only what changed. In hash
+    storage every CSRF token is its own field, so adding one never rewrites
+    the rest of the session.
+    """
+
     def __init__(self, sid: str, data: dict):
         self.id = sid
         self._data = data
+        self._dirty: set[str] = set()
+        self._removed: set[str] = set()
+
+    @property
+    def data(self):
+        return self._data
 
     @property 
     def user_id(self):
@@ -29,33 +80,288 @@ class Session:
     def csrf_tokens(self):
         return self._data.setdefault("csrf_tokens", [])
 
+    def get(self, key, default=None):
+        return self._data.get(key, default)
+
+    def set(self, key: str, value) -> None:
+        self._data[key] = value
+        self._dirty.add(key)
+        self._removed.discard(key)
+
+    def delete(self, key: str) -> None:
+        self._data.pop(key, None)
+        self._removed.add(key)
+        self._dirty.discard(key)
+
+    def add_csrf_token(self, token: str) -> None:
+        if token not in self.csrf_tokens:
+            self.csrf_tokens.append(token)
+        self._dirty.add(CSRF_FIELD_PREFIX + token)
+        self._removed.discard(CSRF_FIELD_PREFIX + token)
+
+    def remove_csrf_token(self, token: str) -> None:
+        if token in self.csrf_tokens:
+            self.csrf_tokens.remove(token)
+        self._removed.add(CSRF_FIELD_PREFIX + token)
+        self._dirty.discard(CSRF_FIELD_PREFIX + token)
+
+    @property
+    def is_dirty(self) -> bool:
+        return bool(self._dirty or self._removed)
+
+    def mark_clean(self) -> None:
+        self._dirty.clear()
+        self._removed.clear()
+
+    def changes(self) -> tuple[dict[str, str], list[str]]:
+        """Hash fields to write and field names to delete since the last save."""
+        return self.to_fields(self._dirty), sorted(self._removed)
+
     def to_json(self):
         return json.dumps(self._data)
 
+    def to_fields(self, names=None) -> dict[str, str]:
+        """
+        Encode the session (or only the given field names) as Redis hash fields.
+
+        Scalar values are JSON-encoded per field; each CSRF token becomes a
+        `csrf:<token>` field.
+        """
+        if names is None:
+            names = [key for key in self._data if key != "csrf_tokens"]
+            names += [CSRF_FIELD_PREFIX + token for token in self.csrf_tokens]
+        fields = {}
+        for name in names:
+            if name.startswith(CSRF_FIELD_PREFIX):
+                fields[name] = "1"
+            elif name in self._data:
+                fields[name] = json.dumps(self._data[name])
+        return fields
+
+    @staticmethod
+    def decode_fields(fields: dict[str, str]) -> dict:
+        """Inverse of `to_fields`: rebuild the data dict from hash fields."""
+        data = {"csrf_tokens": []}
+        for name, raw in fields.items():
+            if name.startswith(CSRF_FIELD_PREFIX):
+                data["csrf_tokens"].append(name[len(CSRF_FIELD_PREFIX):])
+            else:
+                data[name] = json.loads(raw)
+        return data
+
 class SessionManager:
-    def __init__(self, redis, ttl=604800):
+    """
+    Stores sessions in Redis, with an optional in-process cache in front.
+
+    With `storage="hash"` (the default) a session is a Redis hash and saves
+    only HSET/HDEL the fields that changed. Sessions still stored as a JSON
+    blob by `storage="json"` are converted the first time they are read.
+    Reads slide the expiry, but at most one EXPIRE per session every
+    `refresh_interval` seconds per worker.
+
+    When a local cache is given, every worker keeps recently used sessions in
+    memory. `save_session`/`delete_session` publish the session id on the
+    INVALIDATION_CHANNEL pub/sub channel so the other workers drop their copy. The local
+    cache is bypassed while the invalidation listener is not subscribed, so
+    a missed message can never leave a deleted session servable.
+    """
+
+    def __init__(
+        self,
+        redis,
+        ttl=604800,
+        local_cache: LocalCache | None = None,
+        storage: str = "hash",
+        refresh_interval: float = 300,
+    ):
+        if storage not in ("hash", "json"):
+            raise ValueError(f"Unknown session storage: {storage}")
         self.redis = redis
         self.ttl = ttl
+        self.local_cache = local_cache
+        self.storage = storage
+        self.refresh_interval = refresh_interval
+        self._refreshed = LocalCache(maxsize=100000, ttl=refresh_interval)
+        self._node_id = uuid.uuid4().hex
+        self._generation = 0
+        self._subscribed = False
+        self._listener: asyncio.Task | None = None
+        self._save_fields = redis.script(SAVE_FIELDS_LUA)
+
+    # ---------------- local tier ----------------
+    @property
+    def _channel(self) -> str:
+        return self.redis.key("channel", INVALIDATION_CHANNEL)
+
+    @property
+    def _local_enabled(self) -> bool:
+        return self.local_cache is not None and self._subscribed
+
+    def _evict(self, sid) -> None:
+        # Bumping the generation stops in-flight reads from caching stale data
+        self._generation += 1
+        if self.local_cache is not None:
+            self.local_cache.delete(sid)
+
+    def _on_subscribe(self) -> None:
+        # Anything cached before (re)subscribing may have missed invalidations
+        self._generation += 1
+        if self.local_cache is not None:
+            self.local_cache.clear()
+        self._subscribed = True
+
+    async def _listen(self):
+        while True:
+            try:
+                async for message in self.redis.listen(self._channel, self._on_subscribe):
+                    origin, _, sid = message.partition(":")
+                    if origin != self._node_id:
+                        self._evict(sid)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Session invalidation listener lost connection: %s", e)
+            self._subscribed = False
+            await asyncio.sleep(1)
+
+    async def start(self):
+        """Starts the cross-worker invalidation listener (no-op without a local cache)."""
+        if self.local_cache is not None and self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self):
+        """Stops the invalidation listener and drops the local cache."""
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+        self._subscribed = False
+        if self.local_cache is not None:
+            self.local_cache.clear()
 
+    async def _publish_invalidation(self, sid):
+        if self.local_cache is not None:
+            await self.redis.publish(self._channel, f"{self._node_id}:{sid}")
+
+    # ---------------- storage ----------------
+    def _key(self, sid) -> str:
+        return self.redis.key("session", sid)
+
+    async def _load(self, sid) -> dict | None:
+        key = self._key(sid)
+        if self.storage == "json":
+            raw = await self.redis.get(key)
+            return json.loads(raw) if raw else None
+        try:
+            fields = await self.redis.hgetall(key)
+        except ResponseError:
+            # WRONGTYPE: still a JSON blob from before hash storage
+            return await self._migrate(sid, key)
+        if fields:
+            return Session.decode_fields(fields)
+        if key != sid and await self.redis.exists(sid):
+            # Written before session keys were namespaced
+            return await self._migrate(sid, sid)
+        return None
+
+    async def _migrate(self, sid, source: str) -> dict | None:
+        """Move a legacy session (JSON blob and/or bare key) into a namespaced hash, keeping its TTL."""
+        key = self._key(sid)
+        migrated = {}
+
+        async def rewrite(pipe):
+            # WATCHed: a concurrent delete or migration makes EXEC fail and retry,
+            # so nothing read by a failed attempt may survive into the next one
+            migrated.clear()
+            kind = await pipe.type(source)
+            if kind == "string":
+                data = json.loads(await pipe.get(source))
+            elif kind == "hash" and source != key:
+                data = Session.decode_fields(await pipe.hgetall(source))
+            else:
+                return
+            remaining = await pipe.ttl(source)
+            pipe.multi()
+            pipe.delete(source)
+            pipe.hset(key, mapping=Session(sid, data).to_fields())
+            pipe.expire(key, remaining if remaining > 0 else self.ttl)
+            migrated["data"] = data
+
+        await self.redis.transaction(rewrite, *{source, key})
+        if "data" not in migrated:
+            # Deleted, or migrated by another worker, while we looked
+            fields = await self.redis.hgetall(key)
+            return Session.decode_fields(fields) if fields else None
+        logger.info("Migrated session %s to namespaced hash storage", sid)
+        return migrated["data"]
+
+    async def _touch(self, sid) -> None:
+        """Slide the session expiry, throttled to one EXPIRE per refresh_interval."""
+        if not self.refresh_interval or self._refreshed.get(sid):
+            return
+        self._refreshed.set(sid, True)
+        await self.redis.expire(self._key(sid), self.ttl)
+
+    # ---------------- sessions ----------------
     async def create_session(self, user_id=None):
         sid = str(uuid.uuid4())
         data = {"user_id": str(user_id) if user_id else None, "created_at": datetime.now(timezone.utc).isoformat(), "csrf_tokens": []}
-        await self.redis.set(sid, json.dumps(data), ex=self.ttl)
-        return Session(sid, data)
+        session = Session(sid, data)
+        key = self._key(sid)
+        if self.storage == "json":
+            await self.redis.set(key, session.to_json(), ex=self.ttl)
+        else:
+            async with self.redis.pipeline() as batch:
+                batch.hset(key, mapping=session.to_fields())
+                batch.expire(key, self.ttl)
+        self._refreshed.set(sid, True)
+        return session
 
     async def get_session(self, sid):
-        raw = await self.redis.get(sid)
-        if not raw:
+        if not _valid_sid(sid):
             return None
-        data = json.loads(raw)
-        return Session(sid, data)
+        session = None
+        if self._local_enabled:
+            data = self.local_cache.get(sid)
+            if data is not None:
+                session = Session(sid, copy.deepcopy(data))
+
+        if session is None:
+            generation = self._generation
+            data = await self._load(sid)
+            if data is None:
+                return None
+            if self._local_enabled and generation == self._generation:
+                self.local_cache.set(sid, copy.deepcopy(data))
+            session = Session(sid, data)
+
+        await self._touch(sid)
+        return session
 
     async def save_session(self, session: Session):
-        await self.redis.set(session.id, session.to_json(), ex=self.ttl)
+        key = self._key(session.id)
+        if self.storage == "json":
+            await self.redis.set(key, session.to_json(), ex=self.ttl)
+        else:
+            if not session.is_dirty:
+                return
+            fields, removed = session.changes()
+            args = [self.ttl, len(fields)]
+            for name, value in fields.items():
+                args += [name, value]
+            args += removed
+            if not await self._save_fields(keys=[key], args=args):
+                logger.info("Session %s was deleted before it could be saved", session.id)
+        session.mark_clean()
+        self._refreshed.set(session.id, True)
+        self._evict(session.id)
+        await self._publish_invalidation(session.id)
 
     async def delete_session(self, sid):
-        await self.redis.delete(sid)
-
-async def get_current_user(session: Session):
-    user = await User.get(username=session.username)
-    return user
\ No newline at end of file
+        await self.redis.delete(self._key(sid))
+        self._refreshed.delete(sid)
+        self._evict(sid)
+        await self._publish_invalidation(sid)
@@ -0,0 +1,276 @@
+"""
+Per-user library statistics kept incrementally in Redis.
+
+Each user has one hash (`stats:<user id>`) with a total `count`,
+`status:<status>` and `platform:<platform>` counters, and `rating_sum` /
+`rating_count` for the average rating. Game saves and deletes made through
+Tortoise apply deltas to it, so serving stats is a single HGETALL.
+
+Deltas are only applied to hashes that already exist. A missing hash is
+built on first read from one GROUP BY over the user's games. Queryset
+`.update()`/`.delete()` bypass the signals, and concurrent edits can race.
+`reconcile()` rebuilds every hash from Postgres to correct any drift; it
+runs periodically in one worker (STATS_RECONCILE_INTERVAL) or on demand:
+
+    python -m backend.stats reconcile
+"""
+# Python
+import asyncio
+import logging
+from typing import Any
+# Libraries
+from tortoise.signals import post_delete, post_save, pre_save
+# Application Code
+from backend.app.models import Game
+
+logger = logging.getLogger(__name__)
+
+# HINCRBY every (field, delta) pair in ARGV, but only if the hash exists:
+# a missing hash is rebuilt from the database on the next read instead.
+APPLY_DELTA_LUA = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return 0
+end
+for i = 1, #ARGV, 2 do
+    redis.call('HINCRBY', KEYS[1], ARGV[i], ARGV[i + 1])
+end
+return 1
+"""
+
+# Write a freshly computed hash unless deltas already created one meanwhile
+INIT_LUA = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    return 0
+end
+redis.call('HSET', KEYS[1], unpack(ARGV))
+return 1
+"""
+
+# One row per (owner, status, platform); users without games get a single
+# row of NULLs so their hash is reset to zero as well.
+STATS_SQL = """
+    SELECT u.user_id AS owner_id, g.status, g.platform,
+           count(g.game_id) AS n, coalesce(sum(g.rating), 0) AS rating_sum, count(g.rating) AS rating_count
+    FROM users u LEFT JOIN games g ON g.owner_id = u.user_id
+    {where}
+    GROUP BY u.user_id, g.status, g.platform
+    ORDER BY u.user_id
+"""
+
+
+def _contribution(game: dict[str, Any], sign: int) -> dict[str, int]:
+    fields = {
+        "count": sign,
+        f"status:{game['status']}": sign,
+        f"platform:{game['platform']}": sign,
+    }
+    if game["rating"] is not None:
+        fields["rating_sum"] = sign * game["rating"]
+        fields["rating_count"] = sign
+    return fields
+
+
+def _snapshot(instance: Game) -> dict[str, Any]:
+    return {
+        "owner_id": instance.owner_id,
+        "status": instance.status,
+        "platform": instance.platform,
+        "rating": instance.rating,
+    }
+
+
+def _fold(rows: list[dict[str, Any]]) -> dict[str, int]:
+    """Hash fields for one user from their STATS_SQL rows."""
+    fields = {"count": 0, "rating_sum": 0, "rating_count": 0}
+    for row in rows:
+        if not row["n"]:
+            continue
+        fields["count"] += row["n"]
+        fields[f"status:{row['status']}"] = fields.get(f"status:{row['status']}", 0) + row["n"]
+        fields[f"platform:{row['platform']}"] = fields.get(f"platform:{row['platform']}", 0) + row["n"]
+        fields["rating_sum"] += row["rating_sum"]
+        fields["rating_count"] += row["rating_count"]
+    return fields
+
+
+def _decode(fields: dict[str, str]) -> dict[str, Any]:
+    by_status, by_platform = {}, {}
+    for field, value in fields.items():
+        kind, _, name = field.partition(":")
+        value = int(value)
+        if value <= 0:
+            continue
+        if kind == "status":
+            by_status[name] = value
+        elif kind == "platform":
+            by_platform[name] = value
+    rating_count = int(fields.get("rating_count", 0))
+    return {
+        "count": int(fields.get("count", 0)),
+        "by_status": by_status,
+        "by_platform": by_platform,
+        "average_rating": round(int(fields["rating_sum"]) / rating_count, 2) if rating_count else None,
+    }
+
+
+class GameStats:
+    """Serves and maintains the per-user stats hashes."""
+
+    def __init__(self):
+        self.redis = None
+        self.db = None
+        self._apply = None
+        self._init = None
+
+    def bind(self, redis, db) -> None:
+        """Attach the Redis and raw Postgres adapters. Called from the lifespan."""
+        self.redis = redis
+        self.db = db
+        self._apply = redis.script(APPLY_DELTA_LUA)
+        self._init = redis.script(INIT_LUA)
+
+    def _key(self, user_id) -> str:
+        return self.redis.key("stats", user_id)
+
+    async def get(self, user_id) -> dict[str, Any]:
+        """
+        A user's stats: total, counts by status and platform, average rating.
+
+        Returns:
+            dict: {"count", "by_status", "by_platform", "average_rating"}
+        """
+        user_id = int(user_id)
+        if self.redis is None:
+            rows = await self.db.fetch(STATS_SQL.format(where="WHERE u.user_id = $1"), user_id)
+            return _decode({k: str(v) for k, v in _fold(rows).items()})
+        fields = await self.redis.hgetall(self._key(user_id))
+        if not fields:
+            fields = await self.rebuild(user_id)
+        return _decode({k: str(v) for k, v in fields.items()})
+
+    async def rebuild(self, user_id) -> dict[str, int]:
+        """Compute one user's hash from Postgres and store it if still missing."""
+        rows = await self.db.fetch(STATS_SQL.format(where="WHERE u.user_id = $1"), int(user_id))
+        fields = _fold(rows)
+        args = [item for pair in fields.items() for item in pair]
+        await self._init(keys=[self._key(user_id)], args=args)
+        return fields
+
+    async def apply(self, user_id, delta: dict[str, int]) -> None:
+        delta = {field: value for field, value in delta.items() if value}
+        if self._apply is None or not delta:
+            return
+        args = [item for pair in delta.items() for item in pair]
+        try:
+            await self._apply(keys=[self._key(user_id)], args=args)
+        except Exception as e:
+            # Left for the reconciliation job to repair
+            logger.warning("Failed to update stats for user %s: %s", user_id, e)
+
+    async def reconcile(self, batch_size: int = 5000) -> int:
+        """
+        Rebuild every user's hash from one streamed GROUP BY over all games.
+
+        Each user's hash is replaced atomically (DEL + HSET in MULTI), and
+        writes are pipelined per batch of rows.
+
+        Returns:
+            int: Number of users reconciled.
+        """
+        users = 0
+        current, rows = None, []
+        async for batch in self.db.iter_query(STATS_SQL.format(where=""), batch_size=batch_size):
+            async with self.redis.pipeline(transaction=True) as pipe:
+                for row in batch:
+                    if row["owner_id"] != current and rows:
+                        self._replace(pipe, current, rows)
+                        users += 1
+                        rows = []
+                    current = row["owner_id"]
+                    rows.append(row)
+        if rows:
+            async with self.redis.pipeline(transaction=True) as pipe:
+                self._replace(pipe, current, rows)
+            users += 1
+        return users
+
+    def _replace(self, pipe, user_id, rows) -> None:
+        key = self._key(user_id)
+        pipe.delete(key)
+        pipe.hset(key, mapping=_fold(rows))
+
+
+game_stats = GameStats()
+
+
+async def reconcile_periodically(interval: int) -> None:
+    """
+    Run `reconcile()` every interval seconds in whichever worker takes the lock.
+
+    Started as a task from the lifespan; cancelled at shutdown.
+    """
+    lock = game_stats.redis.key("lock", "stats-reconcile")
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            if await game_stats.redis.acquire_lock(lock, ttl=interval):
+                users = await game_stats.reconcile()
+                logger.info("Reconciled stats for %d users", users)
+        except Exception as e:
+            logger.warning("Stats reconciliation failed: %s", e)
+
+
+@pre_save(Game)
+async def _game_saving(sender, instance, using_db, update_fields) -> None:
+    # Old values are needed to move counters on update; Tortoise keeps no copy
+    if instance._saved_in_db and game_stats.redis is not None:
+        instance._stats_before = await Game.filter(pk=instance.pk).using_db(using_db).first().values(
+            "owner_id", "status", "platform", "rating"
+        )
+
+
+@post_save(Game)
+async def _game_saved(sender, instance, created, using_db, update_fields) -> None:
+    after = _snapshot(instance)
+    before = getattr(instance, "_stats_before", None)
+    instance._stats_before = None
+    if not before:
+        await game_stats.apply(after["owner_id"], _contribution(after, 1))
+    elif before["owner_id"] == after["owner_id"]:
+        delta = _contribution(before, -1)
+        for field, value in _contribution(after, 1).items():
+            delta[field] = delta.get(field, 0) + value
+        await game_stats.apply(after["owner_id"], delta)
+    else:
+        await game_stats.apply(before["owner_id"], _contribution(before, -1))
+        await game_stats.apply(after["owner_id"], _contribution(after, 1))
+
+
+@post_delete(Game)
+async def _game_deleted(sender, instance, using_db) -> None:
+    await game_stats.apply(instance.owner_id, _contribution(_snapshot(instance), -1))
+
+
+async def main():
+    import sys
+    from backend import config
+    from backend.postgres.pool import PoolSettings
+    from backend.postgres.postgres import PostgresAdapter
+    from backend.redis.redis import RedisAdapter
+
+    if sys.argv[1:] != ["reconcile"]:
+        sys.exit("usage: python -m backend.stats reconcile")
+    db = PostgresAdapter()
+    await db.create_pool(settings=PoolSettings.from_config("raw"))
+    redis_conn = RedisAdapter(config.REDIS_URL, tenant=config.REDIS_TENANT)
+    game_stats.bind(redis_conn, db)
+    try:
+        print(f"Reconciled stats for {await game_stats.reconcile()} users")
+    finally:
+        await redis_conn.close()
+        await db.close()
+
+
+# Run the async entrypoint
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,60 @@
+# Python
+from pathlib import Path
+# Libraries
+import jinja2
+from fastapi.templating import Jinja2Templates
+# Application Code
+from backend import config
+
+TEMPLATE_DIR = Path(__file__).parent / "public" / "html"
+
+
+def build_environment(
+    directory: Path = TEMPLATE_DIR,
+    bytecode_cache_dir: str = "",
+    auto_reload: bool = False,
+) -> jinja2.Environment:
+    """
+    The Jinja environment shared by every route.
+
+    Args:
+        directory (Path): Template directory.
+        bytecode_cache_dir (str): If set, compiled templates are stored there
+            and reused by other workers and later restarts.
+        auto_reload (bool): Stat template files on every lookup and recompile
+            on change. Handy in development, a wasted syscall in production.
+    """
+    bytecode_cache = None
+    if bytecode_cache_dir:
+        Path(bytecode_cache_dir).mkdir(parents=True, exist_ok=True)
+        bytecode_cache = jinja2.FileSystemBytecodeCache(bytecode_cache_dir)
+    return jinja2.Environment(
+        loader=jinja2.FileSystemLoader(directory),
+        autoescape=jinja2.select_autoescape(),
+        bytecode_cache=bytecode_cache,
+        auto_reload=auto_reload,
+    )
+
+
+env = build_environment(
+    bytecode_cache_dir=config.TEMPLATE_BYTECODE_CACHE_DIR,
+    auto_reload=config.TEMPLATE_AUTO_RELOAD,
+)
+templates = Jinja2Templates(env=env)
+
+
+def precompile() -> int:
+    """
+    Load every template into the environment's cache. Called from the lifespan.
+
+    Templates are compiled (or read from the bytecode cache) at startup
+    rather than on the first request that needs each one.
+
+    Returns:
+        int: Number of templates loaded.
+    """
+    names = env.list_templates(extensions=["html"])
+    for name in names:
+        env.get_template(name)
+    return len(names)
+
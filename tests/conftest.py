@@ -0,0 +1,8 @@
+# Python
+import os
+# Application Code
+from backend.benchmarks.load_test import CHEAP_HASH_ENV, STAND_IN_ENV
+
+# Settings are read when backend.config is first imported, which can be
+# while any test module is collected, so the stand-in settings go in first
+os.environ.update({**STAND_IN_ENV, **CHEAP_HASH_ENV, "DATABASE_URL": "sqlite://:memory:"})
@@ -0,0 +1,32 @@
+"""
+Concurrent hashing with both argon2 costs pinned: calibration is skipped,
+so the pool's threads are the first to use passlib.
+"""
+# Python
+import subprocess
+import sys
+
+SCRIPT = """
+import asyncio
+from backend.hashing import PasswordHasher
+from backend.password_policy import HashingPolicy
+
+async def main():
+    policy = HashingPolicy(time_cost=1, memory_cost=8192, pin_time_cost=True, pin_memory_cost=True)
+    hasher = PasswordHasher(workers=8, policy=policy)
+    await hasher.calibrate()
+    hasher.start()
+    try:
+        digests = await asyncio.gather(*(hasher.hash(f"password {i}") for i in range(16)))
+        assert all(await asyncio.gather(*(hasher.verify(f"password {i}", d) for i, d in enumerate(digests))))
+    finally:
+        hasher.shutdown()
+
+asyncio.run(main())
+"""
+
+
+def test_concurrent_hashing_with_pinned_costs():
+    # A fresh interpreter, so passlib has not been imported by another test
+    result = subprocess.run([sys.executable, "-c", SCRIPT], capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
@@ -0,0 +1,28 @@
+"""
+Entry points must import on their own: backend.config builds the app, so a
+module-level `from backend import config` below the lifespan's imports
+turns into a circular ImportError for whichever module is imported first.
+"""
+# Python
+import subprocess
+import sys
+# Libraries
+import pytest
+
+ENTRY_POINTS = (
+    "backend.main",
+    "backend.postgres.postgres",
+    "backend.postgres.pool",
+    "backend.querylog",
+    "backend.metrics",
+    "backend.search",
+    "backend.benchmarks.pg_bulk_insert",
+    "backend.benchmarks.game_search",
+)
+
+
+@pytest.mark.parametrize("module", ENTRY_POINTS)
+def test_imports_first(module):
+    # A fresh interpreter, so nothing else has been imported before `module`
+    result = subprocess.run([sys.executable, "-c", f"import {module}"], capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
@@ -0,0 +1,47 @@
+"""
+N+1 detection: a loop that lazily loads Game.owner row by row must be
+flagged, even though Tortoise inlines each row's id into the SQL.
+"""
+# Python
+import asyncio
+import logging
+# Libraries
+from tortoise import Tortoise
+# Application Code
+from backend import metrics
+
+
+async def _owner_per_row(users: int) -> metrics.RequestStats:
+    from backend.app.models import Game, User
+
+    await Tortoise.init(db_url="sqlite://:memory:", modules={"models": ["backend.app.models"]})
+    try:
+        await Tortoise.generate_schemas()
+        for i in range(users):
+            user = await User.create(
+                username=f"user{i}", email=f"user{i}@example.com", digest="-", fname="N", lname=str(i)
+            )
+            await Game.create(gameTitle=f"Game {i}", category="RPG", platform="PC", owner=user)
+        metrics.instrument_tortoise()
+
+        stats = metrics.RequestStats({"type": "http", "method": "GET", "path": "/games"})
+        token = metrics.current.set(stats)
+        try:
+            for game in await Game.all():
+                await game.owner
+        finally:
+            metrics.current.reset(token)
+        return stats
+    finally:
+        await Tortoise.close_connections()
+
+
+def test_per_row_fk_fetch_is_flagged(caplog):
+    stats = asyncio.run(_owner_per_row(users=6))
+    route_metrics = metrics.RouteMetrics(n_plus_one_threshold=5)
+
+    with caplog.at_level(logging.WARNING, logger="backend.metrics"):
+        route_metrics.observe("GET", "/games", 200, 0.01, stats)
+
+    assert route_metrics.routes[("GET", "/games")].n_plus_one == 1
+    assert any("Possible N+1 on GET /games: 6 runs of" in r.getMessage() for r in caplog.records)
@@ -0,0 +1,18 @@
+# Application Code
+from backend.migrate import concurrent_index_name, discover
+
+
+def test_concurrent_index_name():
+    assert concurrent_index_name(
+        'CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS "uniq_users_lower_email" ON "users" (lower(email));'
+    ) == '"uniq_users_lower_email"'
+    assert concurrent_index_name("create index concurrently if not exists idx_x on t (a)") == "idx_x"
+    assert concurrent_index_name('CREATE INDEX "idx_x" ON "t" ("a")') is None
+    assert concurrent_index_name('DROP INDEX CONCURRENTLY IF EXISTS "idx_users_lower_email"') is None
+
+
+def test_every_concurrent_build_is_recognised():
+    for migration in discover():
+        for statement in migration.statements():
+            if "CONCURRENTLY" in statement and statement.upper().startswith("CREATE"):
+                assert concurrent_index_name(statement), statement
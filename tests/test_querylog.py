@@ -0,0 +1,22 @@
+# Application Code
+from backend.querylog import redact_plan
+
+PLAN = [
+    "Index Scan using games_owner_id_status_idx on games  (cost=0.42..8.44 rows=1 width=64) "
+    "(actual time=0.020..0.021 rows=3 loops=1)",
+    "  Index Cond: ((owner_id = 42) AND ((status)::text = 'Playing'::text))",
+    "  Filter: (rating > 7)",
+    "  Rows Removed by Filter: 12",
+    "  Buffers: shared hit=4 read=1",
+    "Planning Time: 0.101 ms",
+    "Execution Time: 0.045 ms",
+]
+
+
+def test_redact_plan_keeps_planner_figures():
+    lines = redact_plan(PLAN).split("\n")
+
+    assert lines[1] == "  Index Cond: ((owner_id = ?) AND ((status)::text = ?::text))"
+    assert lines[2] == "  Filter: (rating > ?)"
+    assert lines[0] == PLAN[0]
+    assert lines[3:] == PLAN[3:]
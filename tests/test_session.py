@@ -0,0 +1,36 @@
+"""Legacy session migration racing a concurrent logout."""
+# Python
+import asyncio
+import json
+# Application Code
+from backend.benchmarks.standins import FakeRedisAdapter
+from backend.session import SessionManager
+
+
+async def _migrate_losing_to_delete() -> dict | None:
+    redis = FakeRedisAdapter()
+    sessions = SessionManager(redis)
+    sid = "legacy"
+    await redis.conn.set(sid, json.dumps({"user_id": "1", "csrf_tokens": []}), ex=60)
+
+    transaction = redis.transaction
+    attempts = 0
+
+    async def racing(func, *watches):
+        async def first_attempt_loses(pipe):
+            nonlocal attempts
+            attempts += 1
+            result = await func(pipe)
+            if attempts == 1:
+                # Deleted by another worker between the reads and EXEC
+                await redis.conn.delete(sid)
+            return result
+
+        return await transaction(first_attempt_loses, *watches)
+
+    redis.transaction = racing
+    return await sessions._load(sid)
+
+
+def test_migration_retry_does_not_resurrect_deleted_session():
+    assert asyncio.run(_migrate_losing_to_delete()) is None
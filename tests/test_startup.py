@@ -0,0 +1,49 @@
+"""
+Startup budget: the app lifespan, run against the load test's local
+stand-ins (Tortoise on in-memory SQLite, fakeredis; see conftest.py),
+must have the worker accepting traffic within STARTUP_BUDGET_MS.
+
+Needs the app's requirements plus requirements-dev.txt.
+"""
+# Python
+import asyncio
+import os
+import time
+
+STARTUP_BUDGET_MS = float(os.getenv("STARTUP_BUDGET_MS", 2000))
+
+
+async def _start() -> tuple[float, dict[str, float], bool, Exception | None]:
+    from backend.app.models import User
+    from backend.benchmarks.standins import FakeRedisAdapter, SQLiteAdapter
+    from backend.main import app
+
+    app.state.db = SQLiteAdapter()
+    app.state.kv_store = FakeRedisAdapter()
+    start = time.perf_counter()
+    async with app.router.lifespan_context(app):
+        accepting = (time.perf_counter() - start) * 1000
+        phases = dict(app.state.startup.phases)
+        deadline = time.perf_counter() + 30
+        while not app.state.ready and time.perf_counter() < deadline:
+            await asyncio.sleep(0.01)
+        ready = app.state.ready
+        # The lifespan only logs a failed Tortoise.init, so check the ORM answers
+        try:
+            await User.exists()
+            database_error = None
+        except Exception as e:
+            database_error = e
+    return accepting, phases, ready, database_error
+
+
+def test_startup_within_budget():
+    accepting, phases, ready, database_error = asyncio.run(_start())
+
+    breakdown = ", ".join(f"{name}={ms:.0f}ms" for name, ms in phases.items())
+    assert accepting <= STARTUP_BUDGET_MS, (
+        f"Lifespan startup took {accepting:.0f} ms, over the {STARTUP_BUDGET_MS:.0f} ms budget ({breakdown})"
+    )
+    assert sum(phases.values()) <= STARTUP_BUDGET_MS, breakdown
+    assert ready, "Warm-up did not finish within 30 s"
+    assert database_error is None, f"Database was not initialized: {database_error!r}"